@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Benchmark concurrent request throughput with database calls run inline on the
+event loop versus offloaded to the bounded database thread pool.
+
+SQLite on local disk answers in microseconds, which hides the problem, so each
+statement is delayed by --latency-ms to emulate a network round trip to a
+hosted database.
+
+Usage (from the backend directory):
+    python benchmarks/bench_db_offload.py --requests 400 --concurrency 50
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from datetime import time as time_of_day
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_tmpdir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmpdir}/bench.db"
+
+import httpx
+from sqlalchemy import event
+
+import database.connection as connection
+from database.connection import Base, SessionLocal, engine
+from models.category import Category
+from models.task import Task
+from models.user import User
+import main
+
+def seed(task_count: int) -> str:
+    """Create a user with some tasks and return a bearer token for them."""
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        category = Category(name="Work")
+        user = User(email="bench@example.com", name="Bench", provider="email")
+        db.add_all([category, user])
+        db.flush()
+        for i in range(task_count):
+            db.add(Task(
+                user_id=user.id,
+                title=f"Task {i}",
+                category_id=category.id,
+                start_time=time_of_day(i % 24, 0),
+                duration_minutes=30
+            ))
+        db.commit()
+        return main.auth_service.create_token(user)
+    finally:
+        db.close()
+
+async def run_load(token: str, total: int, concurrency: int) -> float:
+    """Fire `total` GET /api/tasks requests with bounded concurrency; return req/s."""
+    headers = {"Authorization": f"Bearer {token}"}
+    semaphore = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def one():
+            async with semaphore:
+                response = await client.get("/api/tasks", headers=headers)
+                response.raise_for_status()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(total)))
+        return total / (time.perf_counter() - started)
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=5.0)
+    parser.add_argument("--tasks", type=int, default=50)
+    args = parser.parse_args()
+
+    token = seed(args.tasks)
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _simulated_latency(conn, cursor, statement, parameters, context, executemany):
+        time.sleep(args.latency_ms / 1000)
+
+    results = {}
+    for mode in ("inline", "threadpool"):
+        connection.DB_EXECUTION_MODE = mode
+        # Disable the auth cache so every request performs the user lookup too
+        main.auth_service.principal_cache.clear()
+        main.auth_service.principal_cache.ttl_seconds = 0
+        results[mode] = asyncio.run(run_load(token, args.requests, args.concurrency))
+
+    print(f"requests={args.requests} concurrency={args.concurrency} "
+          f"latency={args.latency_ms}ms threadpool_size={connection.DB_THREADPOOL_SIZE}")
+    for mode, rps in results.items():
+        print(f"  {mode:<10} {rps:8.1f} req/s")
+    print(f"  speedup    {results['threadpool'] / results['inline']:8.2f}x")
+
+if __name__ == "__main__":
+    main_cli()
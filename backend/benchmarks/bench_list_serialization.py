@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Benchmark encoding a large task list with FastAPI's generic jsonable_encoder
+versus the pre-built pydantic adapter behind TypedJSONResponse.
+
+Tasks are seeded into a temporary SQLite database. The generic path renders
+loaded ORM instances, as the endpoint used to; the typed path renders the
+TaskRow records TaskService.get_user_tasks returns now. Both produce a
+{"tasks": [...]} payload as bytes.
+
+Usage (from the backend directory):
+    python benchmarks/bench_list_serialization.py --tasks 10000 --repeat 5
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import time as time_of_day
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_tmpdir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmpdir}/bench.db"
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from database.connection import Base, SessionLocal, engine
+from models.category import Category
+from models.progress import Progress
+from models.response import TypedJSONResponse
+from models.schedule import Schedule
+from models.streak import Streak
+from models.task import Task, task_list_adapter
+from models.user import User
+from services.task_service import TaskService
+
+def load_tasks(task_count: int):
+    """Seed ``task_count`` tasks for one user; return them as ORM objects and as TaskRow records."""
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        category = Category(name="Work")
+        user = User(email="bench@example.com", name="Bench", provider="email")
+        db.add_all([category, user])
+        db.flush()
+        db.add_all([
+            Task(
+                user_id=user.id,
+                title=f"Task {i}",
+                description="Benchmark task",
+                category_id=category.id,
+                start_time=time_of_day(i % 24, i % 60),
+                duration_minutes=30,
+                is_completed=i % 3 == 0
+            )
+            for i in range(task_count)
+        ])
+        db.commit()
+        orm_tasks = db.query(Task).filter(Task.user_id == user.id).all()
+        rows, _ = TaskService().get_user_tasks(user.id, limit=task_count)
+        return orm_tasks, rows
+    finally:
+        db.close()
+
+def generic(tasks) -> bytes:
+    """What FastAPI does with a dict of ORM objects and no response model."""
+    return JSONResponse(jsonable_encoder({"tasks": tasks, "next_cursor": None})).body
+
+def typed(tasks) -> bytes:
+    return TypedJSONResponse(task_list_adapter, {"tasks": tasks, "next_cursor": None}).body
+
+def best_of(render, tasks, repeat: int) -> float:
+    """Fastest of ``repeat`` renders, in seconds."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        render(tasks)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tasks", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    orm_tasks, rows = load_tasks(args.tasks)
+    print(f"tasks={args.tasks} repeat={args.repeat} (best run)")
+    results = {}
+    for name, render, tasks in (("generic", generic, orm_tasks), ("typed", typed, rows)):
+        results[name] = best_of(render, tasks, args.repeat)
+        print(f"  {name:<8} {results[name] * 1000:8.1f} ms  {len(render(tasks)) / 1024:8.0f} KiB")
+    print(f"  speedup  {results['generic'] / results['typed']:8.2f}x")
+
+if __name__ == "__main__":
+    main_cli()
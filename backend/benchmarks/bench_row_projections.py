@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Benchmark loading a user's tasks as full ORM entities versus read-only
+TaskRow projections (with the category joined in, as TaskService does),
+reporting CPU time and memory at several row counts.
+
+Each size is seeded once into a temporary SQLite file. Every measurement then
+runs in a fresh process so one load's memory cannot skew the next: CPU time
+is taken without tracing, and memory (held by the result and peak during the
+load) with tracemalloc in a second pass.
+
+Usage (from the backend directory):
+    python benchmarks/bench_row_projections.py --rows 10000 100000 1000000
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SEED_CHUNK = 50000
+
+def _setup():
+    sys.path.insert(0, BACKEND_DIR)
+    from database.connection import Base, SessionLocal, engine
+    # Every model must be imported for the Task relationships to configure
+    from models.category import Category
+    from models.progress import Progress
+    from models.schedule import Schedule
+    from models.streak import Streak
+    from models.task import Task
+    from models.user import User
+    return Base, SessionLocal, engine, Task, Category
+
+def seed(rows: int):
+    """Create one user's ``rows`` tasks in the database named by DATABASE_URL."""
+    Base, SessionLocal, engine, Task, Category = _setup()
+    from datetime import time as time_of_day
+    from sqlalchemy import insert
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(insert(Category), [{"id": 1, "name": "Work", "color": "#3B82F6"}])
+        for start in range(0, rows, SEED_CHUNK):
+            conn.execute(insert(Task), [
+                {
+                    "user_id": 1,
+                    "title": f"Task {i}",
+                    "description": "Benchmark task",
+                    "category_id": 1,
+                    "start_time": time_of_day(i % 24, i % 60),
+                    "duration_minutes": 30,
+                    "is_recurring": False,
+                    "priority": "medium",
+                    "is_completed": i % 3 == 0
+                }
+                for i in range(start, min(start + SEED_CHUNK, rows))
+            ])
+
+def measure(mode: str, traced: bool) -> dict:
+    """Load every task once with ``mode`` (orm or projection) and report the cost."""
+    Base, SessionLocal, engine, Task, Category = _setup()
+    from database.projections import columns, fetch
+    from models.task import TaskRow
+    from sqlalchemy import select
+
+    db = SessionLocal()
+    db.connection()  # connect before measuring
+    if traced:
+        tracemalloc.start()
+    started_cpu = time.process_time()
+    started = time.perf_counter()
+    if mode == "orm":
+        tasks = db.query(Task).filter(Task.user_id == 1).all()
+    else:
+        tasks = fetch(db, TaskRow, select(
+            *columns(Task, TaskRow, category=Category.name, category_color=Category.color)
+        ).outerjoin(Category, Category.id == Task.category_id).where(Task.user_id == 1))
+    db.close()
+    result = {
+        "rows": len(tasks),
+        "seconds": time.perf_counter() - started,
+        "cpu_seconds": time.process_time() - started_cpu
+    }
+    if traced:
+        held, peak = tracemalloc.get_traced_memory()
+        result.update(held_mb=held / 2**20, peak_mb=peak / 2**20)
+    return result
+
+def run_worker(database_url: str, *args) -> dict:
+    """Run this script with ``args`` in a subprocess against ``database_url``."""
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), *args],
+        env=dict(os.environ, DATABASE_URL=database_url, SQLITE_PRAGMA_PROFILE="default"),
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1]) if output.strip() else {}
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--seed", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--measure", choices=["orm", "projection"], help=argparse.SUPPRESS)
+    parser.add_argument("--traced", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.seed:
+        seed(args.seed)
+        return
+    if args.measure:
+        print(json.dumps(measure(args.measure, args.traced)))
+        return
+
+    print(f"{'rows':>9} {'mode':<11} {'wall s':>8} {'cpu s':>8} {'held MB':>9} {'peak MB':>9}")
+    for rows in args.rows:
+        database_url = f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+        run_worker(database_url, "--seed", str(rows))
+        results = {}
+        for mode in ("orm", "projection"):
+            timing = run_worker(database_url, "--measure", mode)
+            memory = run_worker(database_url, "--measure", mode, "--traced")
+            results[mode] = {**timing, "held_mb": memory["held_mb"], "peak_mb": memory["peak_mb"]}
+            r = results[mode]
+            print(f"{rows:>9} {mode:<11} {r['seconds']:8.2f} {r['cpu_seconds']:8.2f} {r['held_mb']:9.1f} {r['peak_mb']:9.1f}")
+        orm, projection = results["orm"], results["projection"]
+        print(f"{rows:>9} {'saving':<11} {orm['seconds'] / projection['seconds']:7.1f}x "
+              f"{orm['cpu_seconds'] / projection['cpu_seconds']:7.1f}x "
+              f"{orm['held_mb'] / projection['held_mb']:8.1f}x {orm['peak_mb'] / projection['peak_mb']:8.1f}x")
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Benchmark concurrent write throughput on SQLite with the default pragmas versus
+the tuned profile (WAL, synchronous=NORMAL, mmap, larger cache, busy timeout).
+
+Each profile runs in a fresh process on a fresh database file, because the
+engine reads SQLITE_PRAGMA_PROFILE when it is created. Writer threads go
+through TaskService, so every operation commits the same statements the API
+does (task row, progress rollup upsert).
+
+Usage (from the backend directory):
+    python benchmarks/bench_sqlite_pragmas.py --threads 16 --ops 100
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def worker(args):
+    """Run the write load in this process and print the result as JSON."""
+    sys.path.insert(0, BACKEND_DIR)
+    from datetime import time as time_of_day
+    from database.connection import Base, SessionLocal, engine
+    from models.category import Category
+    from models.task import TaskCreate
+    from models.user import User
+    from services.task_service import TaskService
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        category = Category(name="Work")
+        db.add(category)
+        db.flush()
+        users = [User(email=f"bench{i}@example.com", name=f"Bench {i}", provider="email") for i in range(args.threads)]
+        db.add_all(users)
+        db.commit()
+        category_id = category.id
+        user_ids = [user.id for user in users]
+    finally:
+        db.close()
+
+    task_service = TaskService()
+    errors = []
+    locked = []
+
+    def write(user_id):
+        for i in range(args.ops):
+            try:
+                if i % 2 == 0:
+                    task = task_service.create_task(user_id, TaskCreate(
+                        title=f"Task {i}",
+                        category_id=category_id,
+                        start_time=time_of_day(i % 24, (i * 7) % 60),
+                        duration_minutes=15
+                    ))
+                    last_id = task.id
+                else:
+                    task_service.complete_task(last_id, user_id)
+            except Exception as e:
+                (locked if "locked" in str(e) else errors).append(str(e))
+
+    threads = [threading.Thread(target=write, args=(user_id,)) for user_id in user_ids]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    total = args.threads * args.ops
+    failed = len(locked) + len(errors)
+    print(json.dumps({
+        "ops": total,
+        "seconds": round(elapsed, 3),
+        "ops_per_second": round((total - failed) / elapsed, 1),
+        "locked_errors": len(locked),
+        "other_errors": len(errors)
+    }))
+
+def run_profile(profile: str, args) -> dict:
+    """Run the load for one pragma profile in a subprocess on a new database."""
+    tmpdir = tempfile.mkdtemp()
+    env = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite:///{tmpdir}/bench.db",
+        SQLITE_PRAGMA_PROFILE=profile,
+        SQLITE_BUSY_TIMEOUT_MS=str(args.busy_timeout_ms)
+    )
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--worker", "--threads", str(args.threads), "--ops", str(args.ops)],
+        env=env, cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--ops", type=int, default=100, help="Writes per thread")
+    parser.add_argument("--busy-timeout-ms", type=int, default=5000)
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args)
+        return
+
+    results = {profile: run_profile(profile, args) for profile in ("default", "tuned")}
+    print(f"threads={args.threads} ops/thread={args.ops} busy_timeout={args.busy_timeout_ms}ms")
+    for profile, result in results.items():
+        print(f"  {profile:<8} {result['ops_per_second']:8.1f} ops/s  "
+              f"{result['seconds']:7.2f}s  locked={result['locked_errors']} other={result['other_errors']}")
+    print(f"  speedup  {results['tuned']['ops_per_second'] / max(results['default']['ops_per_second'], 0.1):8.2f}x")
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+"""
+HTTP load test for the API with per-endpoint latency percentiles and throughput.
+
+Starts the app under uvicorn against a throwaway database (a temporary SQLite
+file, or --database-url for a scratch Postgres database), seeds synthetic users
+with tasks, then drives a weighted mix of realistic traffic from --concurrency
+closed-loop clients:
+
+    dashboard  - poll GET /api/dashboard with If-None-Match
+    tasks      - list, create, update, complete and delete a task
+    conflicts  - POST /api/tasks/check-conflicts
+    login      - a burst of concurrent logins (bcrypt-bound)
+
+Results (requests, req/s, p50/p95/p99/max latency and status counts per
+endpoint) are printed as JSON so runs can be saved and compared; a readable
+summary goes to stderr.
+
+Usage (from the backend directory):
+    python benchmarks/load_test.py --users 50 --concurrency 20 --duration 30
+    python benchmarks/load_test.py --mix dashboard=70,tasks=20,conflicts=10 --output run.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PASSWORD = "loadtest-password"
+SEED_CHUNK = 1000
+DEFAULT_MIX = "dashboard=40,tasks=30,conflicts=20,login=10"
+
+def seed(args):
+    """Create the synthetic users and their tasks in the database named by DATABASE_URL."""
+    sys.path.insert(0, BACKEND_DIR)
+    from datetime import time as time_of_day
+    from database.connection import engine
+    from models.task import Task
+    from models.user import User
+    from services.auth_service import AuthService
+    from services.progress_service import ProgressService
+    from sqlalchemy import insert, select
+
+    # One bcrypt hash shared by every user keeps seeding fast; logins still verify it
+    hashed_password = AuthService().get_password_hash(PASSWORD)
+    emails = [f"loadtest-{args.run_id}-{i}@example.com" for i in range(args.users)]
+    with engine.begin() as conn:
+        conn.execute(insert(User), [
+            {"email": email, "name": f"Load Test {i}", "hashed_password": hashed_password, "provider": "email", "is_active": True}
+            for i, email in enumerate(emails)
+        ])
+        user_ids = conn.scalars(select(User.id).where(User.email.in_(emails))).all()
+        rows = [
+            {
+                "user_id": user_id,
+                "title": f"Task {i}",
+                "category_id": 1 + i % 5,
+                "start_time": time_of_day(6 + i % 16, (i * 15) % 60),
+                "duration_minutes": 30,
+                "is_recurring": i % 7 == 0,
+                "recurrence_pattern": "daily" if i % 7 == 0 else None,
+                "priority": ("low", "medium", "high")[i % 3],
+                "is_completed": i % 4 == 0
+            }
+            for user_id in user_ids
+            for i in range(args.tasks_per_user)
+        ]
+        for start in range(0, len(rows), SEED_CHUNK):
+            conn.execute(insert(Task), rows[start:start + SEED_CHUNK])
+    ProgressService().backfill()
+
+class LoadTest:
+    """Shared client, per-user state and latency samples for one run."""
+
+    def __init__(self, client: httpx.AsyncClient, users: List[Dict], rng: random.Random, login_burst: int):
+        self.client = client
+        self.users = users
+        self.rng = rng
+        self.login_burst = login_burst
+        self.recording = False
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+    async def call(self, label: str, method: str, url: str, **kwargs) -> Optional[httpx.Response]:
+        """Send one request and record its latency under ``label`` (method and route)."""
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, **kwargs)
+            status = str(response.status_code)
+        except httpx.HTTPError:
+            response, status = None, "error"
+        if self.recording:
+            self.samples[label].append(time.perf_counter() - started)
+            self.statuses[label][status] += 1
+        return response
+
+    def user(self) -> Dict:
+        return self.rng.choice(self.users)
+
+    async def dashboard(self):
+        user = self.user()
+        headers = dict(user["headers"])
+        if user.get("etag"):
+            headers["If-None-Match"] = user["etag"]
+        response = await self.call("GET /api/dashboard", "GET", "/api/dashboard", headers=headers)
+        if response is not None and response.status_code == 200:
+            user["etag"] = response.headers.get("etag")
+
+    async def tasks(self):
+        user = self.user()
+        headers = user["headers"]
+        await self.call("GET /api/tasks", "GET", "/api/tasks", headers=headers)
+        hour = self.rng.randrange(6, 22)
+        response = await self.call("POST /api/tasks", "POST", "/api/tasks", headers=headers, json={
+            "title": "Load test task",
+            "category_id": self.rng.randrange(1, 6),
+            "start_time": f"{hour:02d}:00",
+            "duration_minutes": 30
+        })
+        if response is None or response.status_code != 200:
+            return
+        task_id = response.json()["task"]["id"]
+        await self.call("PUT /api/tasks/{id}", "PUT", f"/api/tasks/{task_id}", headers=headers, json={
+            "title": "Load test task (edited)",
+            "start_time": f"{hour:02d}:30"
+        })
+        await self.call("POST /api/tasks/{id}/complete", "POST", f"/api/tasks/{task_id}/complete", headers=headers)
+        await self.call("DELETE /api/tasks/{id}", "DELETE", f"/api/tasks/{task_id}", headers=headers)
+
+    async def conflicts(self):
+        user = self.user()
+        await self.call("POST /api/tasks/check-conflicts", "POST", "/api/tasks/check-conflicts", headers=user["headers"], json={
+            "start_time": f"{self.rng.randrange(6, 22):02d}:{self.rng.choice(('00', '15', '30', '45'))}",
+            "duration_minutes": self.rng.choice((15, 30, 60))
+        })
+
+    async def login(self):
+        await asyncio.gather(*(
+            self.call("POST /api/auth/login", "POST", "/api/auth/login", json={"email": self.user()["email"], "password": PASSWORD})
+            for _ in range(self.login_burst)
+        ))
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ("dashboard", "tasks", "conflicts", "login"):
+            raise argparse.ArgumentTypeError(f"Unknown scenario: {name}")
+        weights[name] = float(weight or 1)
+    return weights
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    index = max(0, min(len(sorted_values) - 1, round(fraction * len(sorted_values) + 0.5) - 1))
+    return sorted_values[index]
+
+def summarize(samples: List[float], statuses: Dict[str, int], seconds: float) -> Dict:
+    ordered = sorted(samples)
+    to_ms = lambda value: round(value * 1000, 2)
+    return {
+        "requests": len(ordered),
+        "requests_per_second": round(len(ordered) / seconds, 1),
+        "p50_ms": to_ms(percentile(ordered, 0.50)),
+        "p95_ms": to_ms(percentile(ordered, 0.95)),
+        "p99_ms": to_ms(percentile(ordered, 0.99)),
+        "mean_ms": to_ms(sum(ordered) / len(ordered)),
+        "max_ms": to_ms(ordered[-1]),
+        "errors": sum(count for status, count in statuses.items() if status == "error" or status.startswith("5")),
+        "statuses": dict(sorted(statuses.items()))
+    }
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+async def wait_until_up(base_url: str, server: subprocess.Popen, timeout: float = 30):
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        deadline = time.perf_counter() + timeout
+        while time.perf_counter() < deadline:
+            if server.poll() is not None:
+                raise RuntimeError("Server exited during startup")
+            try:
+                if (await client.get("/health")).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError("Server did not become healthy in time")
+
+async def run(args, base_url: str) -> Dict:
+    rng = random.Random(args.random_seed)
+    weights = parse_mix(args.mix)
+    limits = httpx.Limits(max_connections=args.concurrency + args.login_burst)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=args.timeout) as client:
+        # Log every user in up front (not measured), a few at a time so bcrypt isn't overrun
+        emails = [f"loadtest-{args.run_id}-{i}@example.com" for i in range(args.users)]
+        users = []
+        semaphore = asyncio.Semaphore(4)
+
+        async def log_in(email):
+            async with semaphore:
+                for _ in range(20):
+                    response = await client.post("/api/auth/login", json={"email": email, "password": PASSWORD})
+                    if response.status_code == 200:
+                        token = response.json()["access_token"]
+                        users.append({"email": email, "headers": {"Authorization": f"Bearer {token}"}})
+                        return
+                    await asyncio.sleep(0.5)
+                raise RuntimeError(f"Could not log in {email}: {response.status_code} {response.text}")
+
+        await asyncio.gather(*(log_in(email) for email in emails))
+
+        test = LoadTest(client, users, rng, args.login_burst)
+        scenarios = {name: getattr(test, name) for name in weights}
+        names, scenario_weights = list(scenarios), list(weights.values())
+
+        async def client_loop(deadline: float):
+            while time.perf_counter() < deadline:
+                await scenarios[rng.choices(names, scenario_weights)[0]]()
+
+        if args.warmup > 0:
+            warmup_deadline = time.perf_counter() + args.warmup
+            await asyncio.gather(*(client_loop(warmup_deadline) for _ in range(args.concurrency)))
+
+        test.recording = True
+        started = time.perf_counter()
+        deadline = started + args.duration
+        await asyncio.gather(*(client_loop(deadline) for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+        test.recording = False
+
+        server_metrics = None
+        try:
+            server_metrics = (await client.get("/api/metrics")).json()
+        except (httpx.HTTPError, ValueError):
+            pass
+
+    all_samples = [sample for samples in test.samples.values() for sample in samples]
+    all_statuses = defaultdict(int)
+    for statuses in test.statuses.values():
+        for status, count in statuses.items():
+            all_statuses[status] += count
+    return {
+        "config": {
+            "database": "postgresql" if args.database_url and args.database_url.startswith("postgresql") else "sqlite",
+            "users": args.users,
+            "tasks_per_user": args.tasks_per_user,
+            "concurrency": args.concurrency,
+            "duration_seconds": args.duration,
+            "warmup_seconds": args.warmup,
+            "mix": weights,
+            "login_burst": args.login_burst,
+            "server_workers": args.workers,
+            "random_seed": args.random_seed
+        },
+        "elapsed_seconds": round(elapsed, 2),
+        "total": summarize(all_samples, all_statuses, elapsed) if all_samples else {"requests": 0},
+        "endpoints": {
+            label: summarize(samples, test.statuses[label], elapsed)
+            for label, samples in sorted(test.samples.items())
+        },
+        "server_metrics": server_metrics
+    }
+
+def print_summary(result: Dict):
+    out = sys.stderr
+    print(f"{'endpoint':<34} {'reqs':>7} {'req/s':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'errors':>7}", file=out)
+    rows = list(result["endpoints"].items()) + [("TOTAL", result["total"])]
+    for label, stats in rows:
+        if not stats.get("requests"):
+            continue
+        print(f"{label:<34} {stats['requests']:>7} {stats['requests_per_second']:>8.1f} "
+              f"{stats['p50_ms']:>7.1f}ms {stats['p95_ms']:>6.1f}ms {stats['p99_ms']:>6.1f}ms {stats['errors']:>7}", file=out)
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--tasks-per-user", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=20, help="Concurrent closed-loop clients")
+    parser.add_argument("--duration", type=float, default=30, help="Measured seconds")
+    parser.add_argument("--warmup", type=float, default=3, help="Unmeasured seconds before the run")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"Scenario weights (default {DEFAULT_MIX})")
+    parser.add_argument("--login-burst", type=int, default=5, help="Concurrent logins per login scenario")
+    parser.add_argument("--database-url", help="Scratch database to use instead of a temporary SQLite file")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--timeout", type=float, default=30, help="Per-request timeout in seconds")
+    parser.add_argument("--random-seed", type=int, default=1)
+    parser.add_argument("--output", help="Also write the JSON result to this file")
+    parser.add_argument("--seed", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--run-id", default=uuid.uuid4().hex[:8], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    parse_mix(args.mix)
+
+    if args.seed:
+        seed(args)
+        return
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        env = dict(
+            os.environ,
+            DATABASE_URL=args.database_url or f"sqlite:///{tmpdir}/loadtest.db",
+            SECRET_KEY=os.getenv("SECRET_KEY", "load-test-secret-key-with-enough-length"),
+            PYTHONUNBUFFERED="1"
+        )
+        print("🚀 Preparing database...", file=sys.stderr)
+        subprocess.run([sys.executable, "init_db.py"], env=env, cwd=BACKEND_DIR, check=True, stdout=subprocess.DEVNULL)
+        subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--seed", "--run-id", args.run_id,
+             "--users", str(args.users), "--tasks-per-user", str(args.tasks_per_user)],
+            env=env, cwd=BACKEND_DIR, check=True
+        )
+
+        port = free_port()
+        log_path = os.path.join(tmpdir, "server.log")
+        with open(log_path, "w") as log:
+            server = subprocess.Popen(
+                [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+                 "--workers", str(args.workers), "--log-level", "warning"],
+                env=env, cwd=BACKEND_DIR, stdout=log, stderr=subprocess.STDOUT
+            )
+        try:
+            base_url = f"http://127.0.0.1:{port}"
+            asyncio.run(wait_until_up(base_url, server))
+            print(f"📈 Running {args.duration:g}s at concurrency {args.concurrency}...", file=sys.stderr)
+            result = asyncio.run(run(args, base_url))
+        except Exception:
+            with open(log_path) as log:
+                sys.stderr.write(log.read()[-4000:])
+            raise
+        finally:
+            server.terminate()
+            try:
+                server.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                server.kill()
+
+    print_summary(result)
+    output = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    print(output)
+
+if __name__ == "__main__":
+    main_cli()
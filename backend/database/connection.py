@@ -3,7 +3,10 @@ Database connection and session management
 """
 
 import os
-from sqlalchemy import create_engine
+import anyio
+from contextvars import ContextVar
+from functools import partial
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from dotenv import load_dotenv
@@ -13,21 +16,107 @@ load_dotenv()
 # Get database URL from environment
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./schedule_tracker.db")
 
+# Connection pool; the defaults are SQLAlchemy's own. Pre-ping and recycle
+# drop connections the server or a proxy has closed before handing them out.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+
+# SQLite connection settings:
+#   tuned   - WAL journal, NORMAL sync, larger page cache, memory-mapped reads
+#             and a busy timeout, so writers don't block readers or fail fast
+#   default - SQLite's built-in settings (rollback journal, FULL sync)
+SQLITE_PRAGMA_PROFILE = os.getenv("SQLITE_PRAGMA_PROFILE", "tuned")
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", "65536"))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+
+def _is_memory_sqlite(url: str) -> bool:
+    return url in ("sqlite://", "sqlite:///:memory:") or "mode=memory" in url
+
 # Create engine
 if DATABASE_URL.startswith("sqlite"):
+    if _is_memory_sqlite(DATABASE_URL):
+        engine = create_engine(
+            DATABASE_URL,
+            connect_args={"check_same_thread": False}
+        )
+    else:
+        engine = create_engine(
+            DATABASE_URL,
+            connect_args={"check_same_thread": False, "timeout": SQLITE_BUSY_TIMEOUT_MS / 1000},
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT
+        )
+else:
     engine = create_engine(
         DATABASE_URL,
-        connect_args={"check_same_thread": False}
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=DB_POOL_PRE_PING
     )
-else:
-    engine = create_engine(DATABASE_URL)
+
+if engine.dialect.name == "sqlite" and SQLITE_PRAGMA_PROFILE == "tuned":
+    @event.listens_for(engine, "connect")
+    def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+        """Apply the tuned pragma profile to each new SQLite connection."""
+        cursor = dbapi_connection.cursor()
+        try:
+            if not _is_memory_sqlite(DATABASE_URL):
+                cursor.execute("PRAGMA journal_mode=WAL")
+                cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+            cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+            cursor.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}")
+        finally:
+            cursor.close()
+
+# The unit of work of the request being served, if any (see database.unit_of_work)
+current_unit_of_work: ContextVar = ContextVar("current_unit_of_work", default=None)
+
+class _SessionFactory(sessionmaker):
+    """Session factory that joins the current request's unit of work when there is one."""
+
+    def __call__(self, **kwargs):
+        unit = current_unit_of_work.get()
+        if unit is not None and unit.active:
+            return unit.session(**kwargs)
+        return super().__call__(**kwargs)
 
 # Create session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = _SessionFactory(autocommit=False, autoflush=False, bind=engine)
 
 # Create base class for models
 Base = declarative_base()
 
+# How route handlers run blocking database work:
+#   threadpool - in a bounded worker thread pool, keeping the event loop free
+#   inline     - directly on the event loop (only useful for benchmarking)
+DB_EXECUTION_MODE = os.getenv("DB_EXECUTION_MODE", "threadpool")
+
+# Defaults to the pool's capacity (size + overflow) so worker threads never
+# queue behind each other waiting for a connection.
+DB_THREADPOOL_SIZE = int(os.getenv("DB_THREADPOOL_SIZE", str(DB_POOL_SIZE + DB_MAX_OVERFLOW)))
+
+_db_limiter = None
+
+async def run_db(func, *args, **kwargs):
+    """Run a blocking database call without stalling the event loop."""
+    global _db_limiter
+    unit = current_unit_of_work.get()
+    if unit is not None:
+        await unit.reserve_connection()
+    if DB_EXECUTION_MODE == "inline":
+        return func(*args, **kwargs)
+    if _db_limiter is None:
+        _db_limiter = anyio.CapacityLimiter(DB_THREADPOOL_SIZE)
+    return await anyio.to_thread.run_sync(partial(func, *args, **kwargs), limiter=_db_limiter)
+
 def get_db():
     """Get database session."""
     db = SessionLocal()
@@ -36,6 +125,14 @@ def get_db():
     finally:
         db.close()
 
+def conflict_insert(table):
+    """Return an INSERT for ``table`` that supports ON CONFLICT on this database."""
+    if engine.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(table)
+
 def init_db():
     """Initialize database with tables."""
     Base.metadata.create_all(bind=engine) 
\ No newline at end of file
@@ -0,0 +1,75 @@
+"""
+Schema migrations and index checks against the live database
+"""
+
+import os
+from database.connection import Base, engine
+from sqlalchemy import UniqueConstraint, inspect
+from typing import List
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def _import_models():
+    """Register every model on Base.metadata."""
+    import models.category
+    import models.progress
+    import models.schedule
+    import models.streak
+    import models.task
+    import models.tombstone
+    import models.user
+
+def alembic_config():
+    """Alembic configuration for this backend, usable from any working directory."""
+    from alembic.config import Config
+    config = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "migrations"))
+    return config
+
+def upgrade_database():
+    """Bring the database schema up to date.
+    
+    An empty database gets the current models via create_all and is stamped
+    at the latest revision. Anything else, including databases created by
+    create_all or schema.sql before migrations existed, is upgraded; the
+    migrations skip what is already there.
+    """
+    from alembic import command
+    _import_models()
+    config = alembic_config()
+    if not inspect(engine).get_table_names():
+        Base.metadata.create_all(bind=engine)
+        command.stamp(config, "head")
+    else:
+        command.upgrade(config, "head")
+
+def missing_schema() -> List[str]:
+    """Tables, columns, indexes and unique constraints declared on the models but absent from the database.
+    
+    Indexes are matched by table, columns and uniqueness rather than by
+    name, since create_all, schema.sql and the migrations name them
+    differently.
+    """
+    _import_models()
+    inspector = inspect(engine)
+    tables = set(inspector.get_table_names())
+    missing = []
+    for table in Base.metadata.sorted_tables:
+        if table.name not in tables:
+            missing.append(f"{table.name} (table)")
+            continue
+        live_columns = {column["name"] for column in inspector.get_columns(table.name)}
+        missing.extend(f"{table.name}.{column.name} (column)" for column in table.columns if column.name not in live_columns)
+        live = [(tuple(ix["column_names"]), bool(ix["unique"])) for ix in inspector.get_indexes(table.name, include_auto_indexes=True)]
+        live += [(tuple(uc["column_names"]), True) for uc in inspector.get_unique_constraints(table.name)]
+        live.append((tuple(inspector.get_pk_constraint(table.name)["constrained_columns"]), True))
+
+        expected = [(index.name, tuple(c.name for c in index.columns), bool(index.unique)) for index in table.indexes]
+        expected += [
+            (constraint.name or "unique", tuple(c.name for c in constraint.columns), True)
+            for constraint in table.constraints if isinstance(constraint, UniqueConstraint)
+        ]
+        for name, columns, unique in expected:
+            if not any(found == columns and (found_unique or not unique) for found, found_unique in live):
+                missing.append(f"{table.name}.{name} ({', '.join(columns)})")
+    return missing
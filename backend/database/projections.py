@@ -0,0 +1,24 @@
+"""
+Read-only column projections into lightweight row records
+"""
+
+from sqlalchemy.orm import Session
+from typing import List, Type, TypeVar
+
+Record = TypeVar("Record")
+
+def columns(model, record: Type[Record], **joined) -> list:
+    """The columns of ``model`` named by ``record``'s fields, in field order.
+    
+    Fields that come from joined tables are passed as keyword arguments,
+    e.g. ``category=Category.name``.
+    """
+    return [joined[name] if name in joined else getattr(model, name) for name in record._fields]
+
+def fetch(db: Session, record: Type[Record], statement) -> List[Record]:
+    """Run a column ``statement`` and build one ``record`` per row.
+    
+    Column selects skip the identity map and change tracking, and the
+    records are plain tuples, so nothing outlives the session but the data.
+    """
+    return list(map(record._make, db.execute(statement)))
@@ -47,6 +47,7 @@ CREATE TABLE IF NOT EXISTS tasks (
     completed_at TIMESTAMP,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    materialized_through DATE, -- last date expanded into schedules
     FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
     FOREIGN KEY (category_id) REFERENCES categories(id)
 );
@@ -63,6 +64,7 @@ CREATE TABLE IF NOT EXISTS schedules (
     completed_at TIMESTAMP,
     notes TEXT,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP,
     FOREIGN KEY (task_id) REFERENCES tasks(id) ON DELETE CASCADE,
     FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
     UNIQUE(task_id, scheduled_date)
@@ -77,6 +79,7 @@ CREATE TABLE IF NOT EXISTS streaks (
     current_streak INTEGER DEFAULT 0,
     longest_streak INTEGER DEFAULT 0,
     last_completed_date DATE,
+    longest_before_run INTEGER DEFAULT 0, -- longest run that ended before the current one
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
@@ -84,6 +87,16 @@ CREATE TABLE IF NOT EXISTS streaks (
     UNIQUE(user_id, streak_type, task_id)
 );
 
+-- Deleted tasks and schedules, kept for delta sync
+CREATE TABLE IF NOT EXISTS tombstones (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    entity VARCHAR(20) NOT NULL, -- 'task', 'schedule'
+    entity_id INTEGER NOT NULL,
+    deleted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+);
+
 -- Progress tracking table
 CREATE TABLE IF NOT EXISTS progress (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -100,7 +113,10 @@ CREATE TABLE IF NOT EXISTS progress (
 
 -- Create indexes for better performance
 CREATE INDEX IF NOT EXISTS idx_tasks_user_id ON tasks(user_id);
+CREATE INDEX IF NOT EXISTS idx_tasks_user_start_id ON tasks(user_id, start_time, id);
 CREATE INDEX IF NOT EXISTS idx_schedules_user_date ON schedules(user_id, scheduled_date);
 CREATE INDEX IF NOT EXISTS idx_schedules_task_date ON schedules(task_id, scheduled_date);
 CREATE INDEX IF NOT EXISTS idx_streaks_user_type ON streaks(user_id, streak_type);
-CREATE INDEX IF NOT EXISTS idx_progress_user_date ON progress(user_id, date); 
\ No newline at end of file
+CREATE UNIQUE INDEX IF NOT EXISTS uq_streaks_user_daily ON streaks(user_id, streak_type) WHERE task_id IS NULL;
+CREATE INDEX IF NOT EXISTS idx_progress_user_date ON progress(user_id, date);
+CREATE INDEX IF NOT EXISTS idx_tombstones_user_deleted ON tombstones(user_id, deleted_at); 
\ No newline at end of file
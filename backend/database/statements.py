@@ -0,0 +1,47 @@
+"""
+Per-request counting of SQL statements
+"""
+
+from contextvars import ContextVar
+from database.connection import engine
+from sqlalchemy import event
+from starlette.datastructures import MutableHeaders
+from typing import List, Optional
+
+# A one-element list so worker threads (which get a copy of the context)
+# increment the same counter as the request that started them.
+_request_statements: ContextVar[Optional[List[int]]] = ContextVar("request_statements", default=None)
+
+@event.listens_for(engine, "before_cursor_execute")
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    counter = _request_statements.get()
+    if counter is not None:
+        counter[0] += 1
+
+class StatementCountMiddleware:
+    """ASGI middleware reporting how many statements a request executed in ``X-DB-Statements``.
+    
+    The count covers work done before the response starts, which is all of
+    it for regular endpoints.
+    """
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        counter = [0]
+        token = _request_statements.set(counter)
+        
+        async def send_with_count(message):
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append("X-DB-Statements", str(counter[0]))
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_with_count)
+        finally:
+            _request_statements.reset(token)
@@ -0,0 +1,254 @@
+"""
+Request-scoped unit of work: one connection checkout and one commit per request
+"""
+
+import anyio
+import json
+import logging
+import threading
+from database.connection import DB_MAX_OVERFLOW, DB_POOL_SIZE, current_unit_of_work, engine, run_db
+from sqlalchemy import event
+from sqlalchemy.orm import Session, sessionmaker
+from starlette.datastructures import MutableHeaders
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Sessions inside a unit of work flush on commit() but leave the request's
+# transaction to the unit; rollback() (or a failed flush) rolls all of it back.
+_JoinedSession = sessionmaker(autoflush=False, join_transaction_mode="rollback_only")
+
+# Pool slots handed to requests before they check out a connection, so worker
+# threads never block on the pool while requests holding connections wait for
+# a thread. Created on first use, inside the event loop.
+_connection_permits: Optional[anyio.Semaphore] = None
+
+_stats_lock = threading.Lock()
+_stats = {"requests": 0, "checkouts": 0, "max_checkouts": 0, "commits": 0, "rollbacks": 0, "commit_failures": 0}
+_requests_by_checkouts = {"0": 0, "1": 0, "2+": 0}
+
+class UnitOfWork:
+    """Everything one request does to the database, committed once.
+    
+    The connection is checked out the first time a service opens a session.
+    Every ``SessionLocal()`` while the unit is active joins its transaction,
+    so services spread across several calls commit or roll back together.
+    Work that must only follow a durable commit (publishing change events,
+    updating in-memory indexes) is queued with ``after_commit``.
+    
+    Endpoints normally leave committing to the middleware; one that needs
+    its earlier writes committed before continuing can ``await commit()``.
+    """
+    
+    def __init__(self):
+        self.active = True
+        self.checkouts = 0
+        self._connection = None
+        self._transaction = None
+        self._callbacks: List[Callable[[], None]] = []
+        self._has_permit = False
+    
+    async def reserve_connection(self):
+        """Wait for a pool slot on the event loop before the first checkout."""
+        global _connection_permits
+        if self._has_permit or not self.active:
+            return
+        if _connection_permits is None:
+            _connection_permits = anyio.Semaphore(DB_POOL_SIZE + DB_MAX_OVERFLOW)
+        await _connection_permits.acquire()
+        self._has_permit = True
+    
+    def session(self, **kwargs) -> Session:
+        """A session on this unit's connection and transaction."""
+        if self._connection is None:
+            self._connection = engine.connect()
+        if self._transaction is None:
+            self._transaction = self._connection.begin()
+        session = _JoinedSession(bind=self._connection, **kwargs)
+        session.info["unit_of_work"] = self
+        return session
+    
+    def after_commit(self, callback: Callable[[], None]):
+        """Run ``callback`` once the unit has committed; dropped on rollback."""
+        self._callbacks.append(callback)
+    
+    async def commit(self) -> bool:
+        """Commit the work so far and keep the connection for the rest of the request."""
+        if self._transaction is None:
+            return True
+        return await run_db(self._commit)
+    
+    async def release(self) -> bool:
+        """Commit the work so far and hand back the connection and pool slot.
+        
+        The unit stays active: a later session checks out a connection
+        again. Returns False when the commit did not happen.
+        """
+        if not self.active:
+            return True
+        try:
+            if self._connection is not None:
+                return await run_db(self._end, True)
+            return True
+        finally:
+            self._release_permit()
+    
+    async def finish(self, commit: bool) -> bool:
+        """Commit (or roll back) and release the connection.
+        
+        Returns False only when a commit was asked for and did not happen.
+        Later calls do nothing.
+        """
+        if not self.active:
+            return True
+        self.active = False
+        saved = True
+        try:
+            if self._connection is not None:
+                saved = await run_db(self._end, commit) or not commit
+        finally:
+            self._release_permit()
+            _record(self.checkouts)
+        return saved
+    
+    def _release_permit(self):
+        if self._has_permit:
+            self._has_permit = False
+            _connection_permits.release()
+    
+    def _end(self, commit: bool) -> bool:
+        """Finish the transaction and release the connection; returns whether it committed."""
+        try:
+            if commit:
+                return self._commit()
+            if self._transaction is not None:
+                self._transaction = None
+                self._callbacks = []
+                _count("rollbacks")
+            return False
+        finally:
+            self._connection.close()
+            self._connection = None
+    
+    def _commit(self) -> bool:
+        """Commit the open transaction, then run the after-commit callbacks."""
+        transaction, self._transaction = self._transaction, None
+        callbacks, self._callbacks = self._callbacks, []
+        if transaction is None:
+            return True
+        if not transaction.is_active:
+            # A failed flush already rolled the request's work back
+            _count("rollbacks")
+            return False
+        try:
+            transaction.commit()
+        except Exception:
+            logger.exception("Unit of work commit failed")
+            _count("commit_failures")
+            return False
+        _count("commits")
+        
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception:
+                logger.exception("After-commit callback failed")
+        return True
+
+async def get_unit_of_work() -> UnitOfWork:
+    """FastAPI dependency: the current request's unit of work."""
+    return current_unit_of_work.get()
+
+async def release_connection() -> bool:
+    """Commit the current request's work so far and give back its connection.
+    
+    Call it before awaiting something slow that needs no database, such as
+    password hashing, so the wait doesn't hold a pool slot that other
+    requests are queued for.
+    """
+    unit = current_unit_of_work.get()
+    if unit is None:
+        return True
+    return await unit.release()
+
+def after_commit(db: Session, callback: Callable[[], None]):
+    """Run ``callback`` once ``db``'s work is durably committed.
+    
+    Call it after ``db.commit()``. Outside a request's unit of work that
+    commit was final, so ``callback`` runs straight away.
+    """
+    unit = db.info.get("unit_of_work")
+    if unit is None:
+        callback()
+    else:
+        unit.after_commit(callback)
+
+@event.listens_for(engine, "checkout")
+def _count_checkout(dbapi_connection, connection_record, connection_proxy):
+    unit = current_unit_of_work.get()
+    if unit is not None:
+        unit.checkouts += 1
+
+def _count(name: str):
+    with _stats_lock:
+        _stats[name] += 1
+
+def _record(checkouts: int):
+    with _stats_lock:
+        _stats["requests"] += 1
+        _stats["checkouts"] += checkouts
+        _stats["max_checkouts"] = max(_stats["max_checkouts"], checkouts)
+        _requests_by_checkouts["0" if checkouts == 0 else "1" if checkouts == 1 else "2+"] += 1
+
+def unit_of_work_stats() -> Dict:
+    """Per-request connection checkouts and commit outcomes since startup."""
+    with _stats_lock:
+        return {**_stats, "requests_by_checkouts": dict(_requests_by_checkouts)}
+
+class UnitOfWorkMiddleware:
+    """ASGI middleware giving each HTTP request its own unit of work.
+    
+    The unit commits when the response starts with a status below 400 and
+    rolls back otherwise, so the client never sees success for work that
+    was not saved; a failed commit turns the response into a 500. The
+    number of connection checkouts is reported in ``X-DB-Checkouts``.
+    """
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        unit = UnitOfWork()
+        token = current_unit_of_work.set(unit)
+        replaced = False
+        
+        async def send_after_commit(message):
+            nonlocal replaced
+            if replaced:
+                return
+            if message["type"] == "http.response.start":
+                if not await unit.finish(message["status"] < 400):
+                    replaced = True
+                    body = json.dumps({"detail": "Could not save changes"}).encode()
+                    await send({
+                        "type": "http.response.start",
+                        "status": 500,
+                        "headers": [
+                            (b"content-type", b"application/json"),
+                            (b"content-length", str(len(body)).encode())
+                        ]
+                    })
+                    await send({"type": "http.response.body", "body": body})
+                    return
+                MutableHeaders(scope=message).append("X-DB-Checkouts", str(unit.checkouts))
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_after_commit)
+        finally:
+            current_unit_of_work.reset(token)
+            await unit.finish(False)
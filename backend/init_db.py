@@ -13,16 +13,17 @@ from models.task import Task
 from models.schedule import Schedule
 from models.streak import Streak
 from models.progress import Progress
+from models.tombstone import Tombstone
 
 def init_database():
     """Initialize the database with tables and default data."""
     print("🚀 Initializing database...")
     
     try:
-        # Create all tables
-        from database.connection import Base
-        Base.metadata.create_all(bind=engine)
-        print("✅ Tables created successfully")
+        # Create tables, or migrate an existing database to the current schema
+        from database.migrate import upgrade_database
+        upgrade_database()
+        print("✅ Schema is up to date")
         
         # Initialize default categories
         db = SessionLocal()
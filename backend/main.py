@@ -3,33 +3,58 @@
 Main FastAPI application for Daily Schedule Tracker
 """
 
-from fastapi import FastAPI, HTTPException, Depends, status
+from fastapi import FastAPI, HTTPException, Depends, Query, Request, Response, status
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from contextlib import asynccontextmanager
+import asyncio
 import uvicorn
 import os
+from datetime import date as date_type
+from typing import Optional
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
 # Import our modules
-from database.connection import get_db
-from models.user import User
-from models.category import Category
-from models.task import Task, TaskCreate, TaskUpdate
-from models.schedule import Schedule, ScheduleCreate, ScheduleUpdate
-from models.streak import Streak
+from database.connection import run_db
+from database.migrate import missing_schema
+from database.statements import StatementCountMiddleware
+from database.unit_of_work import UnitOfWork, UnitOfWorkMiddleware, get_unit_of_work, unit_of_work_stats
+from models.user import User, UserSavedResponse, UserUpdate
+from models.response import TypedJSONResponse
+from models.task import ConflictBatchRequest, Task, TaskBulkRequest, TaskCreate, TaskDetailResponse, TaskListResponse, TaskSavedResponse, TaskUpdate, TemplateApplyResponse, task_list_adapter
+from models.tombstone import SyncResponse
+from models.schedule import Schedule, ScheduleCreate, ScheduleListResponse, ScheduleUpdate, schedule_list_adapter
+from models.streak import Streak, StreakListResponse, streak_list_adapter
 from models.progress import Progress
 from services.auth_service import AuthService
+from services.password_hasher import PasswordHashingBusy
 from services.task_service import TaskService
 from services.schedule_service import ScheduleService
 from services.streak_service import StreakService
-from services.progress_service import ProgressService
+from services.progress_service import ProgressService, analytics_cache
+from services.template_service import TemplateService
+from services.dashboard_service import DashboardService
+from services.change_stream import TooManyStreams, change_hub
+from services.sync_service import SyncService, decode_sync_cursor
+from services.reference_data import create_reference_data_service
 
 # Security
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
+
+# Upper bound on slots accepted by the batch conflict check
+MAX_CONFLICT_PROPOSALS = 500
+
+# Upper bound on task ids across the operations of one bulk request
+MAX_BULK_TASK_IDS = 500
+
+# Longest date range served by GET /api/schedules
+MAX_SCHEDULE_RANGE_DAYS = 62
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -38,11 +63,22 @@ async def lifespan(app: FastAPI):
     print("🚀 Starting Daily Schedule Tracker API...")
     print(f"📊 Environment: {os.getenv('ENVIRONMENT', 'development')}")
     print(f"🔗 Database: {os.getenv('DATABASE_URL', 'sqlite:///./schedule_tracker.db')}")
+    try:
+        missing = missing_schema()
+        if missing:
+            print(f"⚠️ Database is missing {len(missing)} tables/columns/indexes declared on the models; run `python init_db.py` or `alembic upgrade head`:")
+            for name in missing:
+                print(f"   - {name}")
+    except Exception as e:
+        print(f"⚠️ Could not check database schema: {e}")
+    change_hub.start(asyncio.get_running_loop())
     
     yield
     
     # Shutdown
     print("🛑 Shutting down Daily Schedule Tracker API...")
+    change_hub.close()
+    auth_service.password_hasher.shutdown()
 
 # Create FastAPI app
 app = FastAPI(
@@ -52,6 +88,9 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# One connection and one commit per request; added first so CORS wraps its responses
+app.add_middleware(UnitOfWorkMiddleware)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -59,7 +98,9 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-DB-Statements", "X-DB-Checkouts"],
 )
+app.add_middleware(StatementCountMiddleware)
 
 # Initialize services
 auth_service = AuthService()
@@ -67,13 +108,18 @@ task_service = TaskService()
 schedule_service = ScheduleService()
 streak_service = StreakService()
 progress_service = ProgressService()
+template_service = TemplateService(task_service)
+sync_service = SyncService()
+dashboard_service = DashboardService(task_service, schedule_service, streak_service, progress_service)
+reference_data_service = create_reference_data_service(template_service.get_templates)
 
 # Dependency to get current user
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    """Get current authenticated user."""
+async def authenticate(token: Optional[str]) -> User:
+    """Resolve a bearer token to its user, or raise 401."""
     try:
-        token = credentials.credentials
-        user = auth_service.verify_token(token)
+        user = auth_service.principal_cache.get(token) if token else None
+        if user is None and token:
+            user = await run_db(auth_service.load_principal, token)
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -86,6 +132,17 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
             detail="Invalid authentication credentials"
         )
 
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    """Get current authenticated user."""
+    return await authenticate(credentials.credentials)
+
+async def get_stream_user(
+    token: Optional[str] = Query(None),
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security)
+):
+    """Get current user from the Authorization header or, for EventSource, a ``token`` query parameter."""
+    return await authenticate(credentials.credentials if credentials else token)
+
 # Health check endpoint
 @app.get("/")
 async def root():
@@ -101,13 +158,26 @@ async def health_check():
     """Health check endpoint."""
     return {"status": "healthy"}
 
+@app.get("/api/metrics")
+async def get_metrics():
+    """Runtime counters for caches and worker pools."""
+    return {
+        "auth_cache": auth_service.principal_cache.stats(),
+        "password_hashing": auth_service.password_hasher.stats(),
+        "analytics_cache": analytics_cache.stats(),
+        "change_stream": change_hub.stats(),
+        "unit_of_work": unit_of_work_stats()
+    }
+
 # Authentication endpoints
-@app.post("/api/auth/register")
+@app.post("/api/auth/register", response_model=UserSavedResponse)
 async def register(user_data: dict):
     """Register a new user."""
     try:
-        user = auth_service.register_user(user_data)
+        user = await auth_service.register_user_async(user_data)
         return {"message": "User registered successfully", "user": user}
+    except PasswordHashingBusy as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -115,8 +185,10 @@ async def register(user_data: dict):
 async def login(credentials: dict):
     """Login user."""
     try:
-        token = auth_service.login_user(credentials)
+        token = await auth_service.login_user_async(credentials)
         return {"access_token": token, "token_type": "bearer"}
+    except PasswordHashingBusy as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
     except Exception as e:
         raise HTTPException(status_code=401, detail=str(e))
 
@@ -124,47 +196,139 @@ async def login(credentials: dict):
 async def google_auth(token_data: dict):
     """Authenticate with Google token."""
     try:
-        user = auth_service.verify_google_token(token_data["token"])
+        user = await run_db(auth_service.verify_google_token, token_data["token"])
         token = auth_service.create_token(user)
         return {"access_token": token, "token_type": "bearer", "user": user}
     except Exception as e:
         raise HTTPException(status_code=401, detail=str(e))
 
+# Dashboard endpoint
+@app.get("/api/dashboard")
+async def get_dashboard(
+    request: Request,
+    response: Response,
+    current_user: User = Depends(get_current_user),
+    unit_of_work: UnitOfWork = Depends(get_unit_of_work)
+):
+    """Everything the dashboard shows in one response, with a per-user version ETag."""
+    today = date_type.today()
+    etag = dashboard_service.get_etag(current_user.id, today)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag in (tag.strip() for tag in request.headers.get("if-none-match", "").split(",")):
+        return Response(status_code=304, headers=headers)
+    
+    await run_db(dashboard_service.expand_today, current_user.id, today)
+    # Publish the expansion before the snapshot takes its ETag
+    await unit_of_work.commit()
+    etag, snapshot = await run_db(dashboard_service.get_snapshot, current_user.id, today)
+    response.headers.update({**headers, "ETag": etag})
+    return snapshot
+
+# Change stream endpoint
+@app.get("/api/changes/stream")
+async def stream_changes(current_user: User = Depends(get_stream_user)):
+    """Server-sent events for each committed change to the user's tasks, schedules and streaks."""
+    try:
+        messages = change_hub.open(current_user.id)
+    except TooManyStreams:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many open change streams"
+        )
+    return StreamingResponse(
+        messages,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+# Sync endpoint
+@app.get("/api/sync", response_model=SyncResponse)
+async def sync_changes(
+    since: Optional[str] = None,
+    current_user: User = Depends(get_current_user)
+):
+    """Tasks and schedules changed since the ``since`` cursor, plus deleted ids; pass cursor back as since."""
+    try:
+        since_at = decode_sync_cursor(since) if since else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return await run_db(sync_service.get_changes, current_user.id, since_at)
+
+# User endpoints
+@app.put("/api/users/me", response_model=UserSavedResponse)
+async def update_current_user(
+    user_data: UserUpdate,
+    current_user: User = Depends(get_current_user)
+):
+    """Update the current user's profile."""
+    user = await run_db(auth_service.update_user, current_user.id, user_data)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    return {"message": "User updated successfully", "user": user}
+
+@app.delete("/api/users/me")
+async def deactivate_current_user(current_user: User = Depends(get_current_user)):
+    """Deactivate the current user."""
+    success = await run_db(auth_service.deactivate_user, current_user.id)
+    if not success:
+        raise HTTPException(status_code=404, detail="User not found")
+    return {"message": "User deactivated successfully"}
+
 # Task endpoints
-@app.get("/api/tasks")
-async def get_tasks(current_user: User = Depends(get_current_user)):
-    """Get all tasks for the current user."""
-    tasks = task_service.get_user_tasks(current_user.id)
-    return {"tasks": tasks}
+@app.get("/api/tasks", response_model=TaskListResponse)
+async def get_tasks(
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = None,
+    is_completed: Optional[bool] = None,
+    category_id: Optional[int] = None,
+    priority: Optional[str] = None,
+    is_recurring: Optional[bool] = None,
+    current_user: User = Depends(get_current_user)
+):
+    """Get a page of tasks for the current user; pass next_cursor back as cursor for the next page."""
+    try:
+        tasks, next_cursor = await run_db(
+            task_service.get_user_tasks,
+            current_user.id,
+            limit=limit,
+            cursor=cursor,
+            is_completed=is_completed,
+            category_id=category_id,
+            priority=priority,
+            is_recurring=is_recurring
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return TypedJSONResponse(task_list_adapter, {"tasks": tasks, "next_cursor": next_cursor})
 
-@app.post("/api/tasks")
+@app.post("/api/tasks", response_model=TaskSavedResponse)
 async def create_task(
     task_data: TaskCreate,
     current_user: User = Depends(get_current_user)
 ):
     """Create a new task."""
-    task = task_service.create_task(current_user.id, task_data)
+    task = await run_db(task_service.create_task, current_user.id, task_data)
     return {"message": "Task created successfully", "task": task}
 
-@app.get("/api/tasks/{task_id}")
+@app.get("/api/tasks/{task_id}", response_model=TaskDetailResponse)
 async def get_task(
     task_id: int,
     current_user: User = Depends(get_current_user)
 ):
     """Get a specific task."""
-    task = task_service.get_task(task_id, current_user.id)
+    task = await run_db(task_service.get_task, task_id, current_user.id)
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
     return {"task": task}
 
-@app.put("/api/tasks/{task_id}")
+@app.put("/api/tasks/{task_id}", response_model=TaskSavedResponse)
 async def update_task(
     task_id: int,
     task_data: TaskUpdate,
     current_user: User = Depends(get_current_user)
 ):
     """Update a task."""
-    task = task_service.update_task(task_id, current_user.id, task_data)
+    task = await run_db(task_service.update_task, task_id, current_user.id, task_data)
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
     return {"message": "Task updated successfully", "task": task}
@@ -176,7 +340,7 @@ async def delete_task(
 ):
     """Delete a task."""
     try:
-        success = task_service.delete_task(task_id, current_user.id)
+        success = await run_db(task_service.delete_task, task_id, current_user.id)
         if not success:
             raise HTTPException(status_code=404, detail="Task not found")
         return {"message": "Task deleted successfully"}
@@ -190,7 +354,7 @@ async def complete_task(
 ):
     """Mark a task as completed."""
     try:
-        success = task_service.complete_task(task_id, current_user.id)
+        success = await run_db(task_service.complete_task, task_id, current_user.id)
         if not success:
             raise HTTPException(status_code=404, detail="Task not found")
         return {"message": "Task marked as completed"}
@@ -204,7 +368,7 @@ async def uncomplete_task(
 ):
     """Mark a task as not completed."""
     try:
-        success = task_service.uncomplete_task(task_id, current_user.id)
+        success = await run_db(task_service.uncomplete_task, task_id, current_user.id)
         if not success:
             raise HTTPException(status_code=404, detail="Task not found")
         return {"message": "Task marked as not completed"}
@@ -225,7 +389,8 @@ async def check_time_conflicts(
         if not start_time or duration_minutes is None:
             raise HTTPException(status_code=400, detail="start_time and duration_minutes are required")
         
-        conflicts = task_service.check_time_conflicts(
+        conflicts = await run_db(
+            task_service.check_time_conflicts,
             current_user.id, 
             start_time, 
             duration_minutes, 
@@ -240,15 +405,67 @@ async def check_time_conflicts(
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/api/tasks/check-conflicts/batch")
+async def check_time_conflicts_batch(
+    conflict_data: ConflictBatchRequest,
+    current_user: User = Depends(get_current_user)
+):
+    """Check many proposed time slots for conflicts in one request."""
+    proposals = conflict_data.proposals
+    if not proposals:
+        raise HTTPException(status_code=400, detail="proposals must be a non-empty list")
+    if len(proposals) > MAX_CONFLICT_PROPOSALS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_CONFLICT_PROPOSALS} proposals per request")
+    
+    results = await run_db(task_service.check_time_conflicts_batch, current_user.id, proposals)
+    return {
+        "has_conflicts": any(result["has_conflicts"] for result in results),
+        "results": results
+    }
+
+@app.post("/api/tasks/bulk")
+async def bulk_update_tasks(
+    bulk_data: TaskBulkRequest,
+    current_user: User = Depends(get_current_user)
+):
+    """Complete, uncomplete, delete or reschedule many tasks in one transaction."""
+    if not bulk_data.operations:
+        raise HTTPException(status_code=400, detail="operations must be a non-empty list")
+    if sum(len(operation.task_ids) for operation in bulk_data.operations) > MAX_BULK_TASK_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BULK_TASK_IDS} task ids per request")
+    for operation in bulk_data.operations:
+        if operation.action == "reschedule" and operation.start_time is None and operation.duration_minutes is None:
+            raise HTTPException(status_code=400, detail="reschedule needs start_time or duration_minutes")
+    
+    results = await run_db(task_service.bulk_update_tasks, current_user.id, bulk_data.operations)
+    return {
+        "changed": sum(result["status"] in ("updated", "deleted") for result in results),
+        "results": results
+    }
+
 # Schedule endpoints
-@app.get("/api/schedules/{date}")
+@app.get("/api/schedules")
+async def get_schedule_range(
+    start: date_type = Query(..., alias="from"),
+    end: date_type = Query(..., alias="to"),
+    current_user: User = Depends(get_current_user)
+):
+    """Get schedules for a date range (inclusive), grouped by day."""
+    if end < start:
+        raise HTTPException(status_code=400, detail="'to' must not be before 'from'")
+    if (end - start).days + 1 > MAX_SCHEDULE_RANGE_DAYS:
+        raise HTTPException(status_code=400, detail=f"Range may span at most {MAX_SCHEDULE_RANGE_DAYS} days")
+    days = await run_db(schedule_service.get_user_schedule_range, current_user.id, start, end)
+    return {"from": start, "to": end, "days": days}
+
+@app.get("/api/schedules/{date}", response_model=ScheduleListResponse)
 async def get_schedule(
-    date: str,
+    date: date_type,
     current_user: User = Depends(get_current_user)
 ):
     """Get schedule for a specific date."""
-    schedules = schedule_service.get_user_schedule(current_user.id, date)
-    return {"schedules": schedules}
+    schedules = await run_db(schedule_service.get_user_schedule, current_user.id, date)
+    return TypedJSONResponse(schedule_list_adapter, {"schedules": schedules})
 
 @app.post("/api/schedules")
 async def create_schedule(
@@ -256,7 +473,7 @@ async def create_schedule(
     current_user: User = Depends(get_current_user)
 ):
     """Create a new schedule entry."""
-    schedule = schedule_service.create_schedule(current_user.id, schedule_data)
+    schedule = await run_db(schedule_service.create_schedule, current_user.id, schedule_data)
     return {"message": "Schedule created successfully", "schedule": schedule}
 
 @app.put("/api/schedules/{schedule_id}")
@@ -266,7 +483,7 @@ async def update_schedule(
     current_user: User = Depends(get_current_user)
 ):
     """Update a schedule entry."""
-    schedule = schedule_service.update_schedule(schedule_id, current_user.id, schedule_data)
+    schedule = await run_db(schedule_service.update_schedule, schedule_id, current_user.id, schedule_data)
     if not schedule:
         raise HTTPException(status_code=404, detail="Schedule not found")
     return {"message": "Schedule updated successfully", "schedule": schedule}
@@ -277,128 +494,143 @@ async def complete_schedule(
     current_user: User = Depends(get_current_user)
 ):
     """Mark a schedule as completed."""
-    result = schedule_service.complete_schedule(schedule_id, current_user.id)
+    result = await run_db(schedule_service.complete_schedule, schedule_id, current_user.id)
     if not result:
         raise HTTPException(status_code=404, detail="Schedule not found")
     
     # Update streaks
-    streak_service.update_streaks(current_user.id, schedule_id)
+    streak_updated = await run_db(streak_service.update_streaks, current_user.id, schedule_id)
+    
+    return {"message": "Schedule completed successfully", "streak_updated": streak_updated}
+
+@app.post("/api/schedules/{schedule_id}/uncomplete")
+async def uncomplete_schedule(
+    schedule_id: int,
+    current_user: User = Depends(get_current_user)
+):
+    """Mark a schedule as not completed."""
+    result = await run_db(schedule_service.uncomplete_schedule, schedule_id, current_user.id)
+    if not result:
+        raise HTTPException(status_code=404, detail="Schedule not found")
+    
+    # Roll back streaks
+    streak_updated = await run_db(streak_service.revert_streaks, current_user.id, schedule_id)
     
-    return {"message": "Schedule completed successfully", "streak_updated": True}
+    return {"message": "Schedule marked as not completed", "streak_updated": streak_updated}
+
+@app.delete("/api/schedules/{schedule_id}")
+async def delete_schedule(
+    schedule_id: int,
+    current_user: User = Depends(get_current_user)
+):
+    """Delete a schedule entry."""
+    deleted = await run_db(schedule_service.delete_schedule, schedule_id, current_user.id)
+    if not deleted:
+        raise HTTPException(status_code=404, detail="Schedule not found")
+    
+    # A deleted completion no longer counts, as if it had been uncompleted
+    if deleted.status == "completed":
+        await run_db(streak_service.revert_completion, current_user.id, deleted.task_id, deleted.scheduled_date)
+    return {"message": "Schedule deleted successfully"}
 
 # Streak endpoints
-@app.get("/api/streaks")
+@app.get("/api/streaks", response_model=StreakListResponse)
 async def get_streaks(current_user: User = Depends(get_current_user)):
     """Get all streaks for the current user."""
-    streaks = streak_service.get_user_streaks(current_user.id)
-    return {"streaks": streaks}
+    streaks = await run_db(streak_service.get_user_streaks, current_user.id)
+    return TypedJSONResponse(streak_list_adapter, {"streaks": streaks})
 
 @app.get("/api/streaks/daily")
 async def get_daily_streak(current_user: User = Depends(get_current_user)):
     """Get daily streak for the current user."""
-    streak = streak_service.get_daily_streak(current_user.id)
+    streak = await run_db(streak_service.get_daily_streak, current_user.id)
     return {"streak": streak}
 
 # Progress endpoints
-@app.get("/api/progress/{date}")
-async def get_progress(
-    date: str,
-    current_user: User = Depends(get_current_user)
-):
-    """Get progress for a specific date."""
-    progress = progress_service.get_user_progress(current_user.id, date)
-    return {"progress": progress}
-
 @app.get("/api/progress/weekly")
 async def get_weekly_progress(current_user: User = Depends(get_current_user)):
     """Get weekly progress for the current user."""
-    progress = progress_service.get_weekly_progress(current_user.id)
+    progress = await run_db(progress_service.get_weekly_progress, current_user.id)
     return {"progress": progress}
 
 @app.get("/api/progress/monthly")
 async def get_monthly_progress(current_user: User = Depends(get_current_user)):
     """Get monthly progress for the current user."""
-    progress = progress_service.get_monthly_progress(current_user.id)
+    progress = await run_db(progress_service.get_monthly_progress, current_user.id)
+    return {"progress": progress}
+
+@app.get("/api/progress/{date}")
+async def get_progress(
+    date: str,
+    current_user: User = Depends(get_current_user)
+):
+    """Get progress for a specific date."""
+    progress = await run_db(progress_service.get_user_progress, current_user.id, date)
     return {"progress": progress}
 
 # Analytics endpoints
 @app.get("/api/analytics/summary")
 async def get_analytics_summary(current_user: User = Depends(get_current_user)):
     """Get analytics summary for the current user."""
-    summary = progress_service.get_analytics_summary(current_user.id)
+    summary = await run_db(progress_service.get_analytics_summary, current_user.id)
     return {"summary": summary}
 
 @app.get("/api/analytics/categories")
 async def get_category_analytics(current_user: User = Depends(get_current_user)):
     """Get category-wise analytics."""
-    analytics = progress_service.get_category_analytics(current_user.id)
+    analytics = await run_db(progress_service.get_category_analytics, current_user.id)
     return {"analytics": analytics}
 
-# Categories endpoints
+# Reference data endpoints
+def _reference_response(snapshot, request: Request) -> Response:
+    """Serve a pre-serialized snapshot, answering 304 when the client's copy is current."""
+    headers = {"ETag": snapshot.etag, "Cache-Control": "no-cache"}
+    if snapshot.matches(request.headers.get("if-none-match")):
+        return Response(status_code=304, headers=headers)
+    return Response(content=snapshot.body, media_type="application/json", headers=headers)
+
 @app.get("/api/categories")
-async def get_categories():
+async def get_categories(request: Request):
     """Get all categories."""
     try:
-        db = next(get_db())
-        categories = db.query(Category).all()
-        return {"categories": [
-            {
-                "id": cat.id,
-                "name": cat.name,
-                "color": cat.color,
-                "icon": cat.icon
-            } for cat in categories
-        ]}
+        if reference_data_service.categories_stale():
+            snapshot = await run_db(reference_data_service.get_categories)
+        else:
+            snapshot = reference_data_service.get_categories()
+        return _reference_response(snapshot, request)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 # Template endpoints
 @app.get("/api/templates")
-async def get_templates():
+async def get_templates(request: Request):
     """Get available schedule templates."""
-    templates = [
-        {
-            "id": "student",
-            "name": "Student Schedule",
-            "description": "Balanced schedule for students",
-            "tasks": [
-                {"title": "Morning Study", "time": "08:00", "duration": 60, "category": "Study"},
-                {"title": "Classes", "time": "10:00", "duration": 180, "category": "Study"},
-                {"title": "Lunch Break", "time": "13:00", "duration": 60, "category": "Personal"},
-                {"title": "Afternoon Study", "time": "14:00", "duration": 120, "category": "Study"},
-                {"title": "Exercise", "time": "16:30", "duration": 60, "category": "Exercise"},
-                {"title": "Evening Review", "time": "19:00", "duration": 90, "category": "Study"}
-            ]
-        },
-        {
-            "id": "professional",
-            "name": "Professional Schedule",
-            "description": "Productive work schedule",
-            "tasks": [
-                {"title": "Morning Routine", "time": "07:00", "duration": 60, "category": "Personal"},
-                {"title": "Work Start", "time": "09:00", "duration": 240, "category": "Work"},
-                {"title": "Lunch Break", "time": "13:00", "duration": 60, "category": "Personal"},
-                {"title": "Afternoon Work", "time": "14:00", "duration": 240, "category": "Work"},
-                {"title": "Exercise", "time": "18:00", "duration": 60, "category": "Exercise"},
-                {"title": "Evening Planning", "time": "20:00", "duration": 30, "category": "Work"}
-            ]
-        },
-        {
-            "id": "fitness",
-            "name": "Fitness Focus",
-            "description": "Health and fitness oriented schedule",
-            "tasks": [
-                {"title": "Morning Workout", "time": "06:00", "duration": 60, "category": "Exercise"},
-                {"title": "Breakfast", "time": "07:30", "duration": 30, "category": "Health"},
-                {"title": "Work", "time": "09:00", "duration": 240, "category": "Work"},
-                {"title": "Lunch", "time": "13:00", "duration": 60, "category": "Health"},
-                {"title": "Afternoon Work", "time": "14:00", "duration": 240, "category": "Work"},
-                {"title": "Evening Workout", "time": "18:00", "duration": 60, "category": "Exercise"},
-                {"title": "Dinner", "time": "19:30", "duration": 60, "category": "Health"}
-            ]
-        }
-    ]
-    return {"templates": templates}
+    return _reference_response(reference_data_service.get_templates(), request)
+
+@app.post("/api/templates/{template_id}/apply", response_model=TemplateApplyResponse)
+async def apply_template(
+    template_id: str,
+    options: Optional[dict] = None,
+    current_user: User = Depends(get_current_user)
+):
+    """Create all tasks from a template in one transaction."""
+    force = bool((options or {}).get("force", False))
+    try:
+        result = await run_db(template_service.apply_template, current_user.id, template_id, force)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if result is None:
+        raise HTTPException(status_code=404, detail="Template not found")
+    if not result["created"]:
+        raise HTTPException(
+            status_code=409,
+            detail=jsonable_encoder({"message": "Template conflicts with existing tasks", "conflicts": result["conflicts"]})
+        )
+    return {
+        "message": "Template applied successfully",
+        "tasks": result["tasks"],
+        "conflicts": result["conflicts"]
+    }
 
 if __name__ == "__main__":
     # Run the application
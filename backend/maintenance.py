@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Maintenance commands for scheduled and batch jobs
+
+Usage:
+    python maintenance.py materialize [--days 14]
+    python maintenance.py recompute-streaks
+    python maintenance.py backfill-progress [--user-id ID]
+    python maintenance.py prune-tombstones
+"""
+
+import argparse
+import sys
+from services.progress_service import ProgressService
+from services.recurrence_service import RecurrenceService
+from services.streak_service import StreakService
+from services.sync_service import SyncService
+
+def materialize(args):
+    """Expand recurring tasks into schedules ahead of time."""
+    print(f"📅 Materializing recurring tasks {args.days} days ahead...")
+    created = RecurrenceService().materialize_ahead(args.days)
+    print(f"✅ Created {created} schedule entries")
+
+def recompute_streaks(args):
+    """Rebuild all streaks from completed schedule history."""
+    print("🔥 Recomputing streaks from schedule history...")
+    written = StreakService().recompute_all()
+    print(f"✅ Wrote {written} streaks")
+
+def backfill_progress(args):
+    """Rebuild daily progress rollups from tasks and schedules."""
+    scope = f"user {args.user_id}" if args.user_id else "all users"
+    print(f"📈 Rebuilding progress rollups for {scope}...")
+    written = ProgressService().backfill(args.user_id)
+    print(f"✅ Wrote {written} daily rollups")
+
+def prune_tombstones(args):
+    """Drop delete markers older than the sync retention window."""
+    print("🪦 Pruning old sync tombstones...")
+    removed = SyncService().prune_tombstones()
+    print(f"✅ Removed {removed} tombstones")
+
+def main():
+    parser = argparse.ArgumentParser(description="Daily Schedule Tracker maintenance commands")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    materialize_parser = subparsers.add_parser("materialize", help="Expand recurring tasks into schedules")
+    materialize_parser.add_argument("--days", type=int, default=14, help="How many days ahead to expand")
+    materialize_parser.set_defaults(func=materialize)
+
+    streaks_parser = subparsers.add_parser("recompute-streaks", help="Rebuild all streaks from schedule history")
+    streaks_parser.set_defaults(func=recompute_streaks)
+
+    progress_parser = subparsers.add_parser("backfill-progress", help="Rebuild daily progress rollups")
+    progress_parser.add_argument("--user-id", type=int, default=None, help="Only rebuild this user")
+    progress_parser.set_defaults(func=backfill_progress)
+
+    tombstones_parser = subparsers.add_parser("prune-tombstones", help="Delete tombstones past the sync retention window")
+    tombstones_parser.set_defaults(func=prune_tombstones)
+
+    args = parser.parse_args()
+    try:
+        args.func(args)
+    except Exception as e:
+        print(f"❌ {args.command} failed: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+Alembic environment using the application's engine and models
+"""
+
+from logging.config import fileConfig
+from alembic import context
+from database.connection import Base, engine
+import models.category
+import models.progress
+import models.schedule
+import models.streak
+import models.task
+import models.tombstone
+import models.user
+
+config = context.config
+if config.config_file_name is not None and config.attributes.get("configure_logging", True):
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
+
+target_metadata = Base.metadata
+
+def run_migrations_offline():
+    """Emit SQL for the configured database without connecting."""
+    context.configure(
+        url=str(engine.url),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        render_as_batch=engine.dialect.name == "sqlite"
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+def run_migrations_online():
+    """Run migrations on a connection from the application's engine."""
+    with engine.connect() as connection:
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            render_as_batch=connection.dialect.name == "sqlite"
+        )
+        with context.begin_transaction():
+            context.run_migrations()
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
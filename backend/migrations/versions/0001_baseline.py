@@ -0,0 +1,118 @@
+"""Baseline schema as originally created by init_db.py
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-16
+
+Databases that predate migrations already have these tables, so each table
+is only created when it is missing.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+def _has_table(name):
+    return sa.inspect(op.get_bind()).has_table(name)
+
+def upgrade():
+    if not _has_table("users"):
+        op.create_table(
+            "users",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("email", sa.String(), nullable=False),
+            sa.Column("name", sa.String(), nullable=False),
+            sa.Column("avatar_url", sa.String(), nullable=True),
+            sa.Column("provider", sa.String(), nullable=True),
+            sa.Column("hashed_password", sa.String(), nullable=True),
+            sa.Column("is_active", sa.Boolean(), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True)
+        )
+        op.create_index("ix_users_id", "users", ["id"])
+        op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+    if not _has_table("categories"):
+        op.create_table(
+            "categories",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("name", sa.String(), nullable=False),
+            sa.Column("color", sa.String(), nullable=True),
+            sa.Column("icon", sa.String(), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now())
+        )
+        op.create_index("ix_categories_id", "categories", ["id"])
+
+    if not _has_table("tasks"):
+        op.create_table(
+            "tasks",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+            sa.Column("title", sa.String(), nullable=False),
+            sa.Column("description", sa.Text(), nullable=True),
+            sa.Column("category_id", sa.Integer(), sa.ForeignKey("categories.id"), nullable=False),
+            sa.Column("start_time", sa.Time(), nullable=False),
+            sa.Column("duration_minutes", sa.Integer(), nullable=False),
+            sa.Column("is_recurring", sa.Boolean(), nullable=True),
+            sa.Column("recurrence_pattern", sa.String(), nullable=True),
+            sa.Column("priority", sa.String(), nullable=True),
+            sa.Column("is_completed", sa.Boolean(), nullable=True),
+            sa.Column("completed_at", sa.DateTime(timezone=True), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True)
+        )
+        op.create_index("ix_tasks_id", "tasks", ["id"])
+
+    if not _has_table("schedules"):
+        op.create_table(
+            "schedules",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("task_id", sa.Integer(), sa.ForeignKey("tasks.id"), nullable=False),
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+            sa.Column("scheduled_date", sa.Date(), nullable=False),
+            sa.Column("start_time", sa.Time(), nullable=False),
+            sa.Column("end_time", sa.Time(), nullable=False),
+            sa.Column("status", sa.String(), nullable=True),
+            sa.Column("completed_at", sa.DateTime(), nullable=True),
+            sa.Column("notes", sa.Text(), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now())
+        )
+        op.create_index("ix_schedules_id", "schedules", ["id"])
+
+    if not _has_table("streaks"):
+        op.create_table(
+            "streaks",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+            sa.Column("streak_type", sa.String(), nullable=False),
+            sa.Column("task_id", sa.Integer(), sa.ForeignKey("tasks.id"), nullable=True),
+            sa.Column("current_streak", sa.Integer(), nullable=True),
+            sa.Column("longest_streak", sa.Integer(), nullable=True),
+            sa.Column("last_completed_date", sa.Date(), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True)
+        )
+        op.create_index("ix_streaks_id", "streaks", ["id"])
+
+    if not _has_table("progress"):
+        op.create_table(
+            "progress",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+            sa.Column("date", sa.Date(), nullable=False),
+            sa.Column("total_tasks", sa.Integer(), nullable=True),
+            sa.Column("completed_tasks", sa.Integer(), nullable=True),
+            sa.Column("completion_rate", sa.Numeric(5, 2), nullable=True),
+            sa.Column("total_time_minutes", sa.Integer(), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now())
+        )
+        op.create_index("ix_progress_id", "progress", ["id"])
+
+def downgrade():
+    for table in ("progress", "streaks", "schedules", "tasks", "categories", "users"):
+        if _has_table(table):
+            op.drop_table(table)
@@ -0,0 +1,46 @@
+"""Recurrence watermark, schedule updated_at and sync tombstones
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-16
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+def _has_column(table, column):
+    return column in {c["name"] for c in sa.inspect(op.get_bind()).get_columns(table)}
+
+def _has_table(name):
+    return sa.inspect(op.get_bind()).has_table(name)
+
+def upgrade():
+    if not _has_column("tasks", "materialized_through"):
+        op.add_column("tasks", sa.Column("materialized_through", sa.Date(), nullable=True))
+    if not _has_column("schedules", "updated_at"):
+        op.add_column("schedules", sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True))
+    if not _has_table("tombstones"):
+        op.create_table(
+            "tombstones",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+            sa.Column("entity", sa.String(), nullable=False),
+            sa.Column("entity_id", sa.Integer(), nullable=False),
+            sa.Column("deleted_at", sa.DateTime(timezone=True), server_default=sa.func.now())
+        )
+        op.create_index("ix_tombstones_id", "tombstones", ["id"])
+
+def downgrade():
+    if _has_table("tombstones"):
+        op.drop_table("tombstones")
+    if _has_column("schedules", "updated_at"):
+        with op.batch_alter_table("schedules") as batch:
+            batch.drop_column("updated_at")
+    if _has_column("tasks", "materialized_through"):
+        with op.batch_alter_table("tasks") as batch:
+            batch.drop_column("materialized_through")
@@ -0,0 +1,92 @@
+"""Indexes and unique constraints declared on the models
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-16
+
+Uniqueness is enforced with unique indexes, which SQLite can add without
+rebuilding the table and which ON CONFLICT upserts accept. An index
+is skipped when the database already has one on the same columns, whatever
+it is called (create_all, schema.sql and this migration name them
+differently). Duplicate rows that would block a unique index on derived
+data (progress rollups, streaks) are removed first, keeping the oldest; each
+removal is logged, and maintenance.py can rebuild the data afterwards.
+Duplicate schedules belong to users, so the upgrade stops instead and lists
+them for a manual fix.
+"""
+
+import logging
+from alembic import op
+import sqlalchemy as sa
+
+logger = logging.getLogger("alembic.runtime.migration")
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+# (name, table, columns, unique)
+INDEXES = [
+    ("idx_tasks_user_id", "tasks", ["user_id"], False),
+    ("idx_tasks_user_start_id", "tasks", ["user_id", "start_time", "id"], False),
+    ("idx_schedules_task_date", "schedules", ["task_id", "scheduled_date"], True),
+    ("idx_schedules_user_date", "schedules", ["user_id", "scheduled_date"], False),
+    ("uq_streaks_user_type_task", "streaks", ["user_id", "streak_type", "task_id"], True),
+    ("idx_streaks_user_type", "streaks", ["user_id", "streak_type"], False),
+    ("idx_progress_user_date", "progress", ["user_id", "date"], True),
+    ("idx_tombstones_user_deleted", "tombstones", ["user_id", "deleted_at"], False),
+]
+
+def _existing(table):
+    """(columns, unique) for every index and unique constraint on ``table``."""
+    inspector = sa.inspect(op.get_bind())
+    found = [(tuple(ix["column_names"]), bool(ix["unique"])) for ix in inspector.get_indexes(table, include_auto_indexes=True)]
+    found += [(tuple(uc["column_names"]), True) for uc in inspector.get_unique_constraints(table)]
+    return found
+
+def _covered(table, columns, unique):
+    return any(
+        found_columns == tuple(columns) and (found_unique or not unique)
+        for found_columns, found_unique in _existing(table)
+    )
+
+# Tables whose rows maintenance.py can rebuild, and the command that does it
+REBUILDABLE = {"streaks": "recompute-streaks", "progress": "backfill-progress"}
+
+def _remove_duplicates(table, columns):
+    """Delete all but the lowest id of each group of rows sharing ``columns``.
+    
+    Only derived tables are cleaned up, and every removed id is logged.
+    Duplicates anywhere else stop the upgrade.
+    """
+    column_list = ", ".join(columns)
+    duplicates = (
+        f"FROM {table} WHERE id NOT IN "
+        f"(SELECT keep_id FROM (SELECT MIN(id) AS keep_id FROM {table} GROUP BY {column_list}) AS keep)"
+    )
+    ids = [row[0] for row in op.get_bind().execute(sa.text(f"SELECT id {duplicates} ORDER BY id"))]
+    if not ids:
+        return
+    if table not in REBUILDABLE:
+        raise RuntimeError(
+            f"{table} has {len(ids)} rows duplicating another row's ({column_list}), ids {ids[:50]}; "
+            f"merge or delete them by hand, then rerun the upgrade"
+        )
+    logger.warning("Removing %d duplicate %s rows on (%s), ids %s", len(ids), table, column_list, ids)
+    op.execute(f"DELETE {duplicates}")
+    logger.warning("Run `python maintenance.py %s` to rebuild %s", REBUILDABLE[table], table)
+
+def upgrade():
+    for name, table, columns, unique in INDEXES:
+        if _covered(table, columns, unique):
+            continue
+        if unique:
+            _remove_duplicates(table, columns)
+        op.create_index(name, table, columns, unique=unique)
+
+def downgrade():
+    inspector = sa.inspect(op.get_bind())
+    for name, table, columns, unique in reversed(INDEXES):
+        if name in {ix["name"] for ix in inspector.get_indexes(table)}:
+            op.drop_index(name, table_name=table)
@@ -0,0 +1,51 @@
+"""One daily streak per user
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17
+
+uq_streaks_user_type_task does not keep daily streaks unique: their task_id
+is NULL, and unique indexes treat NULLs as distinct. A partial unique index on
+(user_id, streak_type) WHERE task_id IS NULL does, and gives the streak
+upsert an ON CONFLICT target. Duplicate daily streaks are removed first,
+keeping the oldest; each removal is logged, and `python maintenance.py
+recompute-streaks` rebuilds streaks from history afterwards.
+"""
+
+import logging
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+logger = logging.getLogger("alembic.runtime.migration")
+
+DAILY = "task_id IS NULL"
+
+def _has_index(name):
+    return name in {ix["name"] for ix in sa.inspect(op.get_bind()).get_indexes("streaks")}
+
+def upgrade():
+    if _has_index("uq_streaks_user_daily"):
+        return
+    duplicates = (
+        f"FROM streaks WHERE {DAILY} AND id NOT IN "
+        f"(SELECT keep_id FROM (SELECT MIN(id) AS keep_id FROM streaks WHERE {DAILY} "
+        f"GROUP BY user_id, streak_type) AS keep)"
+    )
+    ids = [row[0] for row in op.get_bind().execute(sa.text(f"SELECT id {duplicates} ORDER BY id"))]
+    if ids:
+        logger.warning("Removing %d duplicate daily streaks, ids %s", len(ids), ids)
+        op.execute(f"DELETE {duplicates}")
+        logger.warning("Run `python maintenance.py recompute-streaks` to rebuild streaks")
+    op.create_index(
+        "uq_streaks_user_daily", "streaks", ["user_id", "streak_type"], unique=True,
+        sqlite_where=sa.text(DAILY), postgresql_where=sa.text(DAILY)
+    )
+
+def downgrade():
+    if _has_index("uq_streaks_user_daily"):
+        op.drop_index("uq_streaks_user_daily", table_name="streaks")
@@ -0,0 +1,47 @@
+"""Best streak before the current run
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17
+
+streaks.longest_before_run holds the longest run that ended before the
+current one, so an uncompleted or deleted schedule can be rolled back by
+replaying only the run it belonged to. Where longest_streak exceeds
+current_streak that value is exactly longest_streak. Elsewhere it is only
+known from history, so it starts at 0 and each such row is logged;
+`python maintenance.py recompute-streaks` fills in the exact values.
+"""
+
+import logging
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+logger = logging.getLogger("alembic.runtime.migration")
+
+def _has_column(table, column):
+    return column in {c["name"] for c in sa.inspect(op.get_bind()).get_columns(table)}
+
+def upgrade():
+    if _has_column("streaks", "longest_before_run"):
+        return
+    op.add_column("streaks", sa.Column("longest_before_run", sa.Integer(), nullable=True))
+    op.execute(
+        "UPDATE streaks SET longest_before_run = "
+        "CASE WHEN longest_streak > current_streak THEN longest_streak ELSE 0 END"
+    )
+    ids = [row[0] for row in op.get_bind().execute(sa.text(
+        "SELECT id FROM streaks WHERE current_streak > 1 AND longest_streak <= current_streak ORDER BY id"
+    ))]
+    if ids:
+        logger.warning("Set longest_before_run to 0 for %d streaks whose earlier runs are unknown, ids %s", len(ids), ids)
+        logger.warning("Run `python maintenance.py recompute-streaks` to rebuild streaks")
+
+def downgrade():
+    if _has_column("streaks", "longest_before_run"):
+        with op.batch_alter_table("streaks") as batch:
+            batch.drop_column("longest_before_run")
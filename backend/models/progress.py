@@ -2,7 +2,7 @@
 Progress model for tracking user progress
 """
 
-from sqlalchemy import Column, Integer, String, Date, DateTime, ForeignKey, Numeric
+from sqlalchemy import Column, Integer, String, Date, DateTime, ForeignKey, Index, Numeric
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from database.connection import Base
@@ -13,6 +13,9 @@ from datetime import datetime, date
 class Progress(Base):
     """Progress database model."""
     __tablename__ = "progress"
+    __table_args__ = (
+        Index("idx_progress_user_date", "user_id", "date", unique=True),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -0,0 +1,25 @@
+"""
+JSON responses serialized through pre-built pydantic adapters
+"""
+
+from fastapi import Response
+from pydantic import TypeAdapter
+from typing import Any, Mapping, Optional
+
+class TypedJSONResponse(Response):
+    """JSON response validated and encoded by a module-level ``TypeAdapter``.
+    
+    ORM objects are read by attribute and the body is written as bytes by
+    pydantic-core, skipping FastAPI's generic ``jsonable_encoder`` walk.
+    """
+    media_type = "application/json"
+    
+    def __init__(
+        self,
+        adapter: TypeAdapter,
+        content: Any,
+        status_code: int = 200,
+        headers: Optional[Mapping[str, str]] = None
+    ):
+        body = adapter.dump_json(adapter.validate_python(content, from_attributes=True))
+        super().__init__(content=body, status_code=status_code, headers=headers)
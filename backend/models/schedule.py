@@ -2,17 +2,21 @@
 Schedule model for managing daily schedule instances
 """
 
-from sqlalchemy import Column, Integer, String, Date, Time, DateTime, Text, ForeignKey
+from sqlalchemy import Column, Integer, String, Date, Time, DateTime, Text, ForeignKey, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from database.connection import Base
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, TypeAdapter
+from typing import List, NamedTuple, Optional
 from datetime import datetime, date, time
 
 class Schedule(Base):
     """Schedule database model."""
     __tablename__ = "schedules"
+    __table_args__ = (
+        Index("idx_schedules_task_date", "task_id", "scheduled_date", unique=True),
+        Index("idx_schedules_user_date", "user_id", "scheduled_date"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     task_id = Column(Integer, ForeignKey("tasks.id"), nullable=False)
@@ -24,6 +28,7 @@ class Schedule(Base):
     completed_at = Column(DateTime, nullable=True)
     notes = Column(Text, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
     # Relationships
     task = relationship("Task", back_populates="schedules")
@@ -56,6 +61,38 @@ class ScheduleResponse(BaseModel):
     completed_at: Optional[datetime] = None
     notes: Optional[str] = None
     created_at: datetime
+    updated_at: Optional[datetime] = None
     
     class Config:
-        from_attributes = True 
\ No newline at end of file
+        from_attributes = True
+
+class ScheduleRow(NamedTuple):
+    """Read-only schedule projection for list reads, without ORM state."""
+    id: int
+    task_id: int
+    user_id: int
+    scheduled_date: date
+    start_time: time
+    end_time: time
+    status: str
+    completed_at: Optional[datetime]
+    notes: Optional[str]
+    created_at: datetime
+    updated_at: Optional[datetime]
+    task_title: str  # joined in from the task and its category
+    category_id: int
+    category_name: Optional[str]
+    category_color: Optional[str]
+
+class ScheduleListItem(ScheduleResponse):
+    """Pydantic model for a schedule in a list, with its task and category joined in."""
+    task_title: str
+    category_id: int
+    category_name: Optional[str] = None
+    category_color: Optional[str] = None
+
+class ScheduleListResponse(BaseModel):
+    """Pydantic model for one day's schedules."""
+    schedules: List[ScheduleListItem]
+
+schedule_list_adapter = TypeAdapter(ScheduleListResponse)
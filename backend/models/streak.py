@@ -2,17 +2,26 @@
 Streak model for tracking user streaks
 """
 
-from sqlalchemy import Column, Integer, String, Date, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Date, DateTime, ForeignKey, Index, text
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from database.connection import Base
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, TypeAdapter
+from typing import List, NamedTuple, Optional
 from datetime import datetime, date
 
 class Streak(Base):
     """Streak database model."""
     __tablename__ = "streaks"
+    __table_args__ = (
+        Index("uq_streaks_user_type_task", "user_id", "streak_type", "task_id", unique=True),
+        # Daily streaks have a NULL task_id, which the index above treats as distinct
+        Index(
+            "uq_streaks_user_daily", "user_id", "streak_type", unique=True,
+            sqlite_where=text("task_id IS NULL"), postgresql_where=text("task_id IS NULL")
+        ),
+        Index("idx_streaks_user_type", "user_id", "streak_type"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -21,6 +30,7 @@ class Streak(Base):
     current_streak = Column(Integer, default=0)
     longest_streak = Column(Integer, default=0)
     last_completed_date = Column(Date, nullable=True)
+    longest_before_run = Column(Integer, default=0)  # longest run that ended before the current one
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
@@ -41,4 +51,22 @@ class StreakResponse(BaseModel):
     updated_at: Optional[datetime] = None
     
     class Config:
-        from_attributes = True 
\ No newline at end of file
+        from_attributes = True
+
+class StreakRow(NamedTuple):
+    """Read-only streak projection for list reads, without ORM state."""
+    id: int
+    user_id: int
+    streak_type: str
+    task_id: Optional[int]
+    current_streak: int
+    longest_streak: int
+    last_completed_date: Optional[date]
+    created_at: datetime
+    updated_at: Optional[datetime]
+
+class StreakListResponse(BaseModel):
+    """Pydantic model for a user's streaks."""
+    streaks: List[StreakResponse]
+
+streak_list_adapter = TypeAdapter(StreakListResponse)
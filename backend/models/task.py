@@ -2,17 +2,24 @@
 Task model for managing user tasks
 """
 
-from sqlalchemy import Column, Integer, String, Text, Time, Boolean, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Text, Time, Boolean, ForeignKey, DateTime, Date, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from database.connection import Base
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, TypeAdapter, conint
+from typing import List, Literal, NamedTuple, Optional
 from datetime import datetime, time
 
 class Task(Base):
     """Task database model."""
     __tablename__ = "tasks"
+    __table_args__ = (
+        Index("idx_tasks_user_id", "user_id"),
+        # Keyset pagination of a user's tasks by (start_time, id)
+        Index("idx_tasks_user_start_id", "user_id", "start_time", "id"),
+    )
+    # Read updated_at back with RETURNING on flush, so saved tasks can be serialized
+    __mapper_args__ = {"eager_defaults": True}
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -28,6 +35,7 @@ class Task(Base):
     completed_at = Column(DateTime(timezone=True), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    materialized_through = Column(Date, nullable=True)  # last date expanded into schedules
     
     # Relationships
     user = relationship("User", back_populates="tasks")
@@ -57,6 +65,27 @@ class TaskUpdate(BaseModel):
     recurrence_pattern: Optional[str] = None
     priority: Optional[str] = None
 
+class TaskBulkOperation(BaseModel):
+    """Pydantic model for one operation of a bulk task request."""
+    action: Literal["complete", "uncomplete", "delete", "reschedule"]
+    task_ids: List[int]
+    start_time: Optional[time] = None  # reschedule only
+    duration_minutes: Optional[int] = None  # reschedule only
+
+class TaskBulkRequest(BaseModel):
+    """Pydantic model for bulk task requests; operations run in order in one transaction."""
+    operations: List[TaskBulkOperation]
+
+class ConflictProposal(BaseModel):
+    """Pydantic model for one proposed slot of a batch conflict check."""
+    start_time: time
+    duration_minutes: conint(ge=0)
+    exclude_task_id: Optional[int] = None
+
+class ConflictBatchRequest(BaseModel):
+    """Pydantic model for batch conflict checks."""
+    proposals: List[ConflictProposal]
+
 class TaskResponse(BaseModel):
     """Pydantic model for task responses."""
     id: int
@@ -69,8 +98,56 @@ class TaskResponse(BaseModel):
     is_recurring: bool
     recurrence_pattern: Optional[str] = None
     priority: str
+    is_completed: Optional[bool] = False
+    completed_at: Optional[datetime] = None
     created_at: datetime
     updated_at: Optional[datetime] = None
     
     class Config:
-        from_attributes = True 
\ No newline at end of file
+        from_attributes = True
+
+class TaskRow(NamedTuple):
+    """Read-only task projection for list reads, without ORM state."""
+    id: int
+    user_id: int
+    title: str
+    description: Optional[str]
+    category_id: int
+    start_time: time
+    duration_minutes: int
+    is_recurring: bool
+    recurrence_pattern: Optional[str]
+    priority: str
+    is_completed: Optional[bool]
+    completed_at: Optional[datetime]
+    created_at: datetime
+    updated_at: Optional[datetime]
+    category: Optional[str]  # category name, joined in
+    category_color: Optional[str]
+
+class TaskDetailResponse(BaseModel):
+    """Pydantic model for a single task."""
+    task: TaskResponse
+
+class TaskSavedResponse(BaseModel):
+    """Pydantic model for a created or updated task."""
+    message: str
+    task: TaskResponse
+
+class TemplateApplyResponse(BaseModel):
+    """Pydantic model for the tasks created from a template."""
+    message: str
+    tasks: List[TaskResponse]
+    conflicts: List[dict]
+
+class TaskListItem(TaskResponse):
+    """Pydantic model for a task in a list, with its category joined in."""
+    category: Optional[str] = None
+    category_color: Optional[str] = None
+
+class TaskListResponse(BaseModel):
+    """Pydantic model for a page of tasks."""
+    tasks: List[TaskListItem]
+    next_cursor: Optional[str] = None
+
+task_list_adapter = TypeAdapter(TaskListResponse)
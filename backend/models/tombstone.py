@@ -0,0 +1,32 @@
+"""
+Tombstone model recording deleted rows for delta sync
+"""
+
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
+from sqlalchemy.sql import func
+from database.connection import Base
+from models.schedule import ScheduleResponse
+from models.task import TaskResponse
+from pydantic import BaseModel
+from typing import Dict, List
+
+class Tombstone(Base):
+    """Tombstone database model."""
+    __tablename__ = "tombstones"
+    __table_args__ = (
+        Index("idx_tombstones_user_deleted", "user_id", "deleted_at"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    entity = Column(String, nullable=False)  # task, schedule
+    entity_id = Column(Integer, nullable=False)
+    deleted_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class SyncResponse(BaseModel):
+    """Pydantic model for delta sync responses."""
+    cursor: str
+    full: bool
+    tasks: List[TaskResponse]
+    schedules: List[ScheduleResponse]
+    deleted: Dict[str, List[int]]
@@ -56,6 +56,11 @@ class UserResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class UserSavedResponse(BaseModel):
+    """Pydantic model for a registered or updated user."""
+    message: str
+    user: UserResponse
+
 class UserLogin(BaseModel):
     """Pydantic model for user login."""
     email: EmailStr
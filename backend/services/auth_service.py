@@ -3,21 +3,175 @@ Authentication service for user management
 """
 
 import os
+import threading
+import time
 import jwt
+from collections import OrderedDict
 from datetime import datetime, timedelta
+from functools import partial
 from passlib.context import CryptContext
-from database.connection import SessionLocal
-from models.user import User, UserCreate, UserLogin
-from typing import Optional
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+from database.connection import SessionLocal, run_db
+from database.unit_of_work import after_commit, release_connection
+from models.user import User, UserCreate, UserUpdate, UserLogin
+from services.password_hasher import create_password_hasher_pool
+from typing import Dict, Optional
 
 # Password hashing
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+password_hasher = create_password_hasher_pool(pwd_context.hash, pwd_context.verify)
+
+class PrincipalCache:
+    """Bounded TTL cache of verified tokens and the user rows they resolve to.
+
+    Entries expire after ``ttl_seconds`` or when the token itself expires,
+    whichever comes first. The least recently used entry is evicted once
+    ``max_entries`` is reached. Each invalidation records a sequence number
+    for the user, so a lookup that read the row before the change can't
+    cache it afterwards. Those records are capped at ``max_entries`` too;
+    evicted ones raise a floor that applies to every user without a record.
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl_seconds: float = 60.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._tokens_by_user: Dict[int, set] = {}
+        self._sequence = 0
+        self._invalidated: "OrderedDict[int, int]" = OrderedDict()
+        self._invalidated_floor = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, token: str) -> Optional[User]:
+        """Return the cached user for a token, or None on a miss."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                self.misses += 1
+                return None
+            user, expires_at = entry
+            if expires_at <= now:
+                self._remove(token)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(token)
+            self.hits += 1
+            return user
+
+    def generation(self, user_id: int) -> int:
+        """Invalidation sequence to pass to put(); read it before loading the user row."""
+        with self._lock:
+            return self._sequence
+
+    def put(self, token: str, user: User, token_expires_at: Optional[float] = None, generation: Optional[int] = None):
+        """Cache a verified token, capped at the token's own expiry.
+
+        With ``generation``, nothing is cached if the user was invalidated
+        since that generation was read.
+        """
+        if self.max_entries <= 0 or self.ttl_seconds <= 0:
+            return
+        expires_at = time.monotonic() + self.ttl_seconds
+        if token_expires_at is not None:
+            expires_at = min(expires_at, time.monotonic() + max(token_expires_at - time.time(), 0))
+        with self._lock:
+            if generation is not None and self._invalidated.get(user.id, self._invalidated_floor) > generation:
+                return
+            if token in self._entries:
+                self._remove(token)
+            self._entries[token] = (user, expires_at)
+            self._tokens_by_user.setdefault(user.id, set()).add(token)
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def invalidate_user(self, user_id: int):
+        """Drop every cached token that resolves to the given user."""
+        with self._lock:
+            self._sequence += 1
+            self._invalidated[user_id] = self._sequence
+            self._invalidated.move_to_end(user_id)
+            while len(self._invalidated) > max(self.max_entries, 0):
+                _, sequence = self._invalidated.popitem(last=False)
+                self._invalidated_floor = max(self._invalidated_floor, sequence)
+            tokens = self._tokens_by_user.pop(user_id, set())
+            for token in tokens:
+                self._entries.pop(token, None)
+            if tokens:
+                self.invalidations += 1
+
+    def clear(self):
+        """Drop all cached entries."""
+        with self._lock:
+            self._entries.clear()
+            self._tokens_by_user.clear()
+
+    def stats(self) -> Dict:
+        """Return hit/miss counters for monitoring."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations
+            }
+
+    def _remove(self, token: str):
+        """Remove a token from both indexes. Caller must hold the lock."""
+        user, _ = self._entries.pop(token)
+        tokens = self._tokens_by_user.get(user.id)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._tokens_by_user[user.id]
+
+# Shared across AuthService instances so invalidation reaches every lookup path
+principal_cache = PrincipalCache(
+    max_entries=int(os.getenv("AUTH_CACHE_MAX_ENTRIES", "10000")),
+    ttl_seconds=float(os.getenv("AUTH_CACHE_TTL_SECONDS", "60"))
+)
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _queue_principal_invalidation(mapper, connection, target):
+    """Note a changed or removed user row; its cached tokens are dropped once the change commits."""
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault("changed_users", set()).add(target.id)
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_cached_principals(session):
+    user_ids = session.info.pop("changed_users", None)
+    if user_ids:
+        after_commit(session, partial(_invalidate_users, user_ids))
+
+@event.listens_for(Session, "after_rollback")
+def _discard_principal_invalidations(session):
+    session.info.pop("changed_users", None)
+
+def _invalidate_users(user_ids):
+    for user_id in user_ids:
+        principal_cache.invalidate_user(user_id)
 
 class AuthService:
     def __init__(self):
         self.secret_key = os.getenv("SECRET_KEY", "your-secret-key-here")
         self.algorithm = os.getenv("ALGORITHM", "HS256")
         self.access_token_expire_minutes = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
+        self.principal_cache = principal_cache
+        self.password_hasher = password_hasher
     
     def verify_password(self, plain_password: str, hashed_password: str) -> bool:
         """Verify a password against its hash."""
@@ -36,6 +190,13 @@ class AuthService:
     
     def verify_token(self, token: str) -> Optional[User]:
         """Verify JWT token and return user."""
+        user = self.principal_cache.get(token)
+        if user is not None:
+            return user
+        return self.load_principal(token)
+    
+    def load_principal(self, token: str) -> Optional[User]:
+        """Decode a token and load its user from the database, bypassing the cache lookup."""
         try:
             payload = jwt.decode(token, self.secret_key, algorithms=[self.algorithm])
             user_id = int(payload.get("sub"))
@@ -44,14 +205,51 @@ class AuthService:
         except jwt.PyJWTError:
             return None
         
+        generation = self.principal_cache.generation(user_id)
         db = SessionLocal()
         try:
             user = db.query(User).filter(User.id == user_id).first()
+            if not user or user.is_active is False:
+                return None
+            self.principal_cache.put(token, user, payload.get("exp"), generation)
             return user
         finally:
             db.close()
     
-    def register_user(self, user_data: dict) -> User:
+    def update_user(self, user_id: int, user_data: UserUpdate) -> Optional[User]:
+        """Update a user's profile."""
+        db = SessionLocal()
+        try:
+            user = db.query(User).filter(User.id == user_id).first()
+            if not user:
+                return None
+            
+            if user_data.name is not None:
+                user.name = user_data.name
+            if user_data.avatar_url is not None:
+                user.avatar_url = user_data.avatar_url
+            
+            db.commit()
+            db.refresh(user)
+            return user
+        finally:
+            db.close()
+    
+    def deactivate_user(self, user_id: int) -> bool:
+        """Deactivate a user so existing tokens stop working."""
+        db = SessionLocal()
+        try:
+            user = db.query(User).filter(User.id == user_id).first()
+            if not user:
+                return False
+            
+            user.is_active = False
+            db.commit()
+            return True
+        finally:
+            db.close()
+    
+    def register_user(self, user_data: dict, hashed_password: Optional[str] = None) -> User:
         """Register a new user."""
         db = SessionLocal()
         try:
@@ -61,7 +259,8 @@ class AuthService:
                 raise Exception("User already exists")
             
             # Create new user
-            hashed_password = self.get_password_hash(user_data["password"]) if user_data.get("password") else None
+            if hashed_password is None and user_data.get("password"):
+                hashed_password = self.get_password_hash(user_data["password"])
             user = User(
                 email=user_data["email"],
                 name=user_data["name"],
@@ -77,12 +276,41 @@ class AuthService:
         finally:
             db.close()
     
+    async def register_user_async(self, user_data: dict) -> User:
+        """Register a new user, hashing the password on the worker pool."""
+        hashed_password = None
+        if user_data.get("password"):
+            hashed_password = await self.password_hasher.hash(user_data["password"])
+        return await run_db(self.register_user, user_data, hashed_password)
+    
+    def get_user_by_email(self, email: str) -> Optional[User]:
+        """Get a user by email address."""
+        db = SessionLocal()
+        try:
+            return db.query(User).filter(User.email == email).first()
+        finally:
+            db.close()
+    
+    async def login_user_async(self, credentials: dict) -> str:
+        """Login user and return token, verifying the password on the worker pool."""
+        user = await run_db(self.get_user_by_email, credentials["email"])
+        if not user or user.is_active is False:
+            raise Exception("Invalid credentials")
+        
+        # Don't hold a pooled connection while queued for bcrypt
+        await release_connection()
+        if user.provider == "email" and user.hashed_password:
+            if not await self.password_hasher.verify(credentials["password"], user.hashed_password):
+                raise Exception("Invalid credentials")
+        
+        return self.create_token(user)
+    
     def login_user(self, credentials: dict) -> str:
         """Login user and return token."""
         db = SessionLocal()
         try:
             user = db.query(User).filter(User.email == credentials["email"]).first()
-            if not user:
+            if not user or user.is_active is False:
                 raise Exception("Invalid credentials")
             
             if user.provider == "email" and user.hashed_password:
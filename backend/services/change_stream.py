@@ -0,0 +1,184 @@
+"""
+Server-sent event fan-out of committed changes to connected clients
+"""
+
+import asyncio
+import json
+import os
+from abc import ABC, abstractmethod
+from services.events import ChangeEvent, data_version, subscribe
+from typing import AsyncIterator, Callable, Dict, Optional, Set
+
+# How long EventSource clients wait before reconnecting
+RECONNECT_DELAY_MS = 5000
+
+class TooManyStreams(Exception):
+    """Raised when a user already has the maximum number of open streams."""
+
+class ChangeBackend(ABC):
+    """Transport that carries change events to the hub of every worker.
+
+    The default in-process backend only reaches streams opened on this
+    process; a broker-backed backend (Redis pub/sub, Postgres LISTEN/NOTIFY)
+    can implement the same three methods to fan out across workers.
+    """
+
+    @abstractmethod
+    def start(self, deliver: Callable[[ChangeEvent], None]):
+        """Begin delivering published events to ``deliver``, from any thread."""
+
+    @abstractmethod
+    def publish(self, change: ChangeEvent):
+        """Send a committed change to every worker."""
+
+    @abstractmethod
+    def close(self):
+        """Stop delivering events."""
+
+class InProcessBackend(ChangeBackend):
+    """Delivers events straight to this process's hub."""
+
+    def __init__(self):
+        self._deliver: Optional[Callable[[ChangeEvent], None]] = None
+
+    def start(self, deliver: Callable[[ChangeEvent], None]):
+        self._deliver = deliver
+
+    def publish(self, change: ChangeEvent):
+        if self._deliver is not None:
+            self._deliver(change)
+
+    def close(self):
+        self._deliver = None
+
+class _Subscription:
+    """One open stream: a bounded queue of encoded SSE messages."""
+
+    def __init__(self, max_pending: int):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_pending)
+
+    def offer(self, message: Optional[str]):
+        """Queue a message; a client that falls behind gets one resync instead of a backlog.
+
+        ``None`` ends the stream and is never dropped.
+        """
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(None if message is None else _format("resync", {}))
+
+class ChangeStreamHub:
+    """Fans committed change events out to each user's open streams.
+
+    Events are committed in worker threads, so delivery hops onto the event
+    loop with ``call_soon_threadsafe``. Each stream has a bounded queue;
+    when it fills, its backlog is replaced by a single ``resync`` event
+    telling the client to refetch. Idle streams get a comment line every
+    ``heartbeat_seconds`` so proxies keep the connection open.
+    """
+
+    def __init__(self, backend: Optional[ChangeBackend] = None):
+        self.backend = backend or InProcessBackend()
+        self.heartbeat_seconds = float(os.getenv("CHANGE_STREAM_HEARTBEAT_SECONDS", "15"))
+        self.max_pending = int(os.getenv("CHANGE_STREAM_MAX_PENDING", "100"))
+        self.max_streams_per_user = int(os.getenv("CHANGE_STREAM_MAX_PER_USER", "10"))
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._subscribers: Dict[int, Set[_Subscription]] = {}
+        self._delivered = 0
+        self._resyncs = 0
+
+    def start(self, loop: asyncio.AbstractEventLoop):
+        """Attach to the running event loop and start receiving from the backend."""
+        self._loop = loop
+        self.backend.start(self._receive)
+
+    def close(self):
+        """Detach from the backend and end every open stream."""
+        self.backend.close()
+        for subscriptions in self._subscribers.values():
+            for subscription in subscriptions:
+                subscription.offer(None)
+        self._loop = None
+
+    def publish(self, change: ChangeEvent):
+        """Change listener: hand a committed change to the backend."""
+        if self._loop is not None:
+            self.backend.publish(change)
+
+    def open(self, user_id: int) -> AsyncIterator[str]:
+        """Return the SSE messages of a new stream for ``user_id``.
+
+        The stream is registered when the iterator starts and unregistered
+        when it ends, so a client that disconnects before the first message
+        holds no slot. The iterator runs until the client disconnects or the
+        hub closes.
+        """
+        if len(self._subscribers.get(user_id, ())) >= self.max_streams_per_user:
+            raise TooManyStreams(user_id)
+        return self._iterate(user_id)
+
+    def stats(self) -> Dict:
+        """Open streams and delivery counters."""
+        return {
+            "users": len(self._subscribers),
+            "streams": sum(len(subscriptions) for subscriptions in self._subscribers.values()),
+            "delivered": self._delivered,
+            "resyncs": self._resyncs
+        }
+
+    async def _iterate(self, user_id: int) -> AsyncIterator[str]:
+        subscription = _Subscription(self.max_pending)
+        self._subscribers.setdefault(user_id, set()).add(subscription)
+        try:
+            yield f"retry: {RECONNECT_DELAY_MS}\n\n"
+            yield _format("ready", {"version": data_version(user_id)})
+            while True:
+                try:
+                    message = await asyncio.wait_for(subscription.queue.get(), self.heartbeat_seconds)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                if message is None:
+                    return
+                if message.startswith("event: resync"):
+                    self._resyncs += 1
+                yield message
+        finally:
+            subscriptions = self._subscribers.get(user_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscribers[user_id]
+
+    def _receive(self, change: ChangeEvent):
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        try:
+            loop.call_soon_threadsafe(self._dispatch, change)
+        except RuntimeError:
+            # Loop shut down between the check and the call
+            pass
+
+    def _dispatch(self, change: ChangeEvent):
+        subscriptions = self._subscribers.get(change.user_id)
+        if not subscriptions:
+            return
+        message = _format("change", {
+            "entity": change.entity,
+            "action": change.action,
+            "id": change.entity_id,
+            "version": data_version(change.user_id)
+        })
+        for subscription in subscriptions:
+            subscription.offer(message)
+            self._delivered += 1
+
+def _format(event_name: str, data: Dict) -> str:
+    """Encode one SSE message."""
+    return f"event: {event_name}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+change_hub = ChangeStreamHub()
+subscribe(change_hub.publish)
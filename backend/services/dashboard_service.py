@@ -0,0 +1,63 @@
+"""
+Dashboard service for the aggregated dashboard snapshot
+"""
+
+import os
+import time
+import uuid
+from services.events import data_version
+from services.progress_service import ProgressService
+from services.schedule_service import ScheduleService
+from services.streak_service import StreakService
+from services.task_service import TaskService
+from datetime import date
+from typing import Dict, Optional, Tuple
+
+# Distinguishes this process's version counters from another process's
+_PROCESS_TAG = uuid.uuid4().hex[:8]
+
+class DashboardService:
+    def __init__(self, task_service: TaskService, schedule_service: ScheduleService,
+                 streak_service: StreakService, progress_service: ProgressService):
+        self.task_service = task_service
+        self.schedule_service = schedule_service
+        self.streak_service = streak_service
+        self.progress_service = progress_service
+        self.task_limit = int(os.getenv("DASHBOARD_TASK_LIMIT", "200"))
+        self.etag_ttl_seconds = float(os.getenv("DASHBOARD_ETAG_TTL_SECONDS", "60"))
+    
+    def get_etag(self, user_id: int, today: Optional[date] = None) -> str:
+        """Version tag for the user's dashboard, computed without touching the database.
+        
+        It changes whenever a write to the user's data commits in this process
+        (see services.events), when the day rolls over, and at least every
+        ``etag_ttl_seconds``, which bounds how long writes from other workers
+        or maintenance.py go unseen. Counters are per-process, so the tag also
+        names the process that issued it.
+        """
+        today = today or date.today()
+        window = int(time.time() // self.etag_ttl_seconds) if self.etag_ttl_seconds > 0 else time.time_ns()
+        return f'W/"{_PROCESS_TAG}-{user_id}-{data_version(user_id)}-{today.isoformat()}-{window}"'
+    
+    def expand_today(self, user_id: int, today: Optional[date] = None):
+        """Expand today's recurring instances ahead of get_snapshot."""
+        self.schedule_service.recurrence_service.materialize_user(user_id, today or date.today())
+    
+    def get_snapshot(self, user_id: int, today: Optional[date] = None) -> Tuple[str, Dict]:
+        """Tasks, today's schedule, streaks and today's progress, with their ETag.
+        
+        Call expand_today and commit first: the tag is taken before the
+        reads, so it only covers writes that have already committed.
+        """
+        today = today or date.today()
+        etag = self.get_etag(user_id, today)
+        tasks, next_cursor = self.task_service.get_user_tasks(user_id, limit=self.task_limit)
+        schedules = self.schedule_service.get_user_schedule_range(user_id, today, today)[today.isoformat()]
+        return etag, {
+            "date": today,
+            "tasks": [task._asdict() for task in tasks],
+            "has_more_tasks": next_cursor is not None,
+            "schedules": schedules,
+            "streaks": [streak._asdict() for streak in self.streak_service.get_user_streaks(user_id)],
+            "progress": self.progress_service.get_user_progress(user_id, today.isoformat())
+        }
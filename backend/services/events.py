@@ -0,0 +1,58 @@
+"""
+In-process notifications for changes to user-owned data
+"""
+
+import logging
+import threading
+from database.unit_of_work import after_commit
+from functools import partial
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+class ChangeEvent(NamedTuple):
+    """A committed change to one of a user's rows."""
+    user_id: int
+    entity: str  # task, schedule, streak
+    action: str  # created, updated, deleted, completed, uncompleted
+    entity_id: Optional[int] = None
+
+_listeners: List[Callable[[ChangeEvent], None]] = []
+_versions: Dict[int, int] = {}
+_versions_lock = threading.Lock()
+
+def subscribe(listener: Callable[[ChangeEvent], None]) -> Callable[[ChangeEvent], None]:
+    """Register a callable invoked for every committed change."""
+    _listeners.append(listener)
+    return listener
+
+def record_change(db: Session, user_id: int, entity: str, action: str, entity_id: Optional[int] = None):
+    """Queue a change on the session; it is delivered only if the transaction commits."""
+    db.info.setdefault("pending_changes", []).append(ChangeEvent(user_id, entity, action, entity_id))
+
+def data_version(user_id: int) -> int:
+    """Counter bumped on every committed change to the user's data in this process."""
+    return _versions.get(user_id, 0)
+
+@event.listens_for(Session, "after_commit")
+def _deliver_changes(session):
+    changes = session.info.pop("pending_changes", None)
+    if changes:
+        after_commit(session, partial(_publish, changes))
+
+def _publish(changes: List[ChangeEvent]):
+    with _versions_lock:
+        for user_id in {change.user_id for change in changes}:
+            _versions[user_id] = _versions.get(user_id, 0) + 1
+    for change in changes:
+        for listener in _listeners:
+            try:
+                listener(change)
+            except Exception:
+                logger.exception("Change listener failed for %s", change)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changes(session):
+    session.info.pop("pending_changes", None)
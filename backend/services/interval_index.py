@@ -0,0 +1,247 @@
+"""
+In-memory interval index of each user's incomplete tasks for fast conflict checks
+"""
+
+import os
+import threading
+import heapq
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from datetime import time
+from time import monotonic
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+def to_minutes(value: time) -> int:
+    """Convert a time of day to minutes since midnight."""
+    return value.hour * 60 + value.minute
+
+class IntervalEntry:
+    """One indexed task: its [start, end) interval in minutes plus display fields."""
+    __slots__ = ("task_id", "start", "end", "title", "start_time", "duration_minutes")
+
+    def __init__(self, task_id: int, title: str, start_time: time, duration_minutes: int):
+        self.task_id = task_id
+        self.title = title
+        self.start_time = start_time
+        self.duration_minutes = duration_minutes or 0
+        self.start = to_minutes(start_time)
+        self.end = self.start + self.duration_minutes
+
+    def key(self) -> Tuple[int, int, int]:
+        return (self.start, self.end, self.task_id)
+
+class UserIntervals:
+    """Intervals for one user, kept sorted by start minute."""
+
+    def __init__(self, entries: Iterable[IntervalEntry] = ()):
+        self.by_id: Dict[int, IntervalEntry] = {}
+        self.keys: List[Tuple[int, int, int]] = []
+        self.max_duration = 0
+        for entry in entries:
+            self.by_id[entry.task_id] = entry
+            self.max_duration = max(self.max_duration, entry.duration_minutes)
+        self.keys = sorted(entry.key() for entry in self.by_id.values())
+
+    def add(self, entry: IntervalEntry):
+        self.remove(entry.task_id)
+        self.by_id[entry.task_id] = entry
+        insort(self.keys, entry.key())
+        self.max_duration = max(self.max_duration, entry.duration_minutes)
+
+    def remove(self, task_id: int):
+        entry = self.by_id.pop(task_id, None)
+        if entry is None:
+            return
+        position = bisect_left(self.keys, entry.key())
+        del self.keys[position]
+        if entry.duration_minutes >= self.max_duration:
+            self.max_duration = max((e.duration_minutes for e in self.by_id.values()), default=0)
+
+    def overlapping(self, start: int, end: int, exclude_task_id: Optional[int] = None) -> List[IntervalEntry]:
+        """Return entries overlapping [start, end), ordered by start.
+
+        No interval longer than ``max_duration`` exists, so anything starting
+        before ``start - max_duration`` cannot reach ``start``. That bounds the
+        scan to a binary search plus the candidates in the window.
+        """
+        overlaps = []
+        position = bisect_left(self.keys, (start - self.max_duration,))
+        while position < len(self.keys):
+            entry_start, entry_end, task_id = self.keys[position]
+            if entry_start >= end:
+                break
+            if entry_end > start and task_id != exclude_task_id:
+                overlaps.append(self.by_id[task_id])
+            position += 1
+        return overlaps
+
+    def sweep(self, proposals: List[Tuple[int, int, Optional[int]]]) -> Tuple[List[List[IntervalEntry]], List[List[int]]]:
+        """Find conflicts for many proposed [start, end) slots in one sweep.
+
+        ``proposals`` holds ``(start, end, exclude_task_id)`` tuples. Indexed
+        tasks and proposals are merged in start order while two heaps track
+        which of each are still open; every interval that starts is checked
+        only against open intervals. Returns, per proposal, the overlapping
+        indexed tasks and the indexes of the overlapping proposals.
+        """
+        task_conflicts: List[List[IntervalEntry]] = [[] for _ in proposals]
+        proposal_conflicts: List[List[int]] = [[] for _ in proposals]
+        if not proposals:
+            return task_conflicts, proposal_conflicts
+
+        order = sorted(range(len(proposals)), key=lambda i: proposals[i][0])
+        last_end = max(end for _, end, _ in proposals)
+        position = bisect_left(self.keys, (proposals[order[0]][0] - self.max_duration,))
+        open_tasks: List[Tuple[int, int]] = []
+        open_proposals: List[Tuple[int, int]] = []
+
+        def close_before(heap, point):
+            while heap and heap[0][0] <= point:
+                heapq.heappop(heap)
+
+        for index in order:
+            start, end, exclude_task_id = proposals[index]
+
+            # Advance through indexed tasks that start before this proposal
+            while position < len(self.keys) and self.keys[position][0] <= start:
+                task_start, task_end, task_id = self.keys[position]
+                close_before(open_proposals, task_start)
+                for _, other in open_proposals:
+                    other_start, other_end, other_exclude = proposals[other]
+                    if task_id != other_exclude and task_start < other_end and task_end > other_start:
+                        task_conflicts[other].append(self.by_id[task_id])
+                heapq.heappush(open_tasks, (task_end, task_id))
+                position += 1
+
+            close_before(open_tasks, start)
+            close_before(open_proposals, start)
+            for task_end, task_id in open_tasks:
+                entry = self.by_id[task_id]
+                if task_id != exclude_task_id and entry.start < end and task_end > start:
+                    task_conflicts[index].append(entry)
+            for _, other in open_proposals:
+                other_start, other_end, _ = proposals[other]
+                if other_start < end and other_end > start:
+                    proposal_conflicts[index].append(other)
+                    proposal_conflicts[other].append(index)
+            heapq.heappush(open_proposals, (end, index))
+
+        # Indexed tasks starting after the last proposal start can still hit open proposals
+        while position < len(self.keys) and self.keys[position][0] < last_end:
+            task_start, task_end, task_id = self.keys[position]
+            close_before(open_proposals, task_start)
+            for _, other in open_proposals:
+                other_start, other_end, other_exclude = proposals[other]
+                if task_id != other_exclude and task_start < other_end and task_end > other_start:
+                    task_conflicts[other].append(self.by_id[task_id])
+            position += 1
+
+        for conflicts in task_conflicts:
+            conflicts.sort(key=IntervalEntry.key)
+        for conflicts in proposal_conflicts:
+            conflicts.sort()
+        return task_conflicts, proposal_conflicts
+
+class TaskIntervalIndex:
+    """Per-user sorted interval indexes, built lazily and maintained incrementally.
+
+    The index lives in process memory. TaskService updates it after each
+    committed write; users not currently indexed are simply rebuilt from the
+    database on their next conflict check. Writes from other workers or
+    maintenance.py are not seen, so a user's index is also rebuilt once it is
+    ``ttl_seconds`` old. The least recently used users are dropped once
+    ``max_users`` is reached.
+    """
+
+    def __init__(self, max_users: int = 10000, ttl_seconds: float = 60.0):
+        self.max_users = max_users
+        self.ttl_seconds = ttl_seconds
+        self._users: "OrderedDict[int, Tuple[UserIntervals, float]]" = OrderedDict()
+        # Write counters for users with a load in progress, so a load that
+        # raced with a write can tell its snapshot is stale
+        self._loading: Dict[int, List[int]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int, loader: Callable[[int], Iterable[IntervalEntry]]) -> UserIntervals:
+        """Return the user's intervals, loading them with ``loader`` on a miss."""
+        started = monotonic()
+        with self._lock:
+            loaded = self._users.get(user_id)
+            if loaded is not None:
+                intervals, loaded_at = loaded
+                if started - loaded_at < self.ttl_seconds:
+                    self._users.move_to_end(user_id)
+                    return intervals
+                del self._users[user_id]
+            state = self._loading.setdefault(user_id, [0, 0])
+            state[0] += 1
+            writes_seen = state[1]
+
+        try:
+            intervals = UserIntervals(loader(user_id))
+        except Exception:
+            with self._lock:
+                self._finish_load(user_id)
+            raise
+
+        with self._lock:
+            # Serve a snapshot that raced with a write for this call, but don't keep it
+            if self._loading[user_id][1] == writes_seen and self.ttl_seconds > 0:
+                self._users[user_id] = (intervals, started)
+                while len(self._users) > self.max_users:
+                    self._users.popitem(last=False)
+            self._finish_load(user_id)
+            return intervals
+
+    def find_overlaps(self, user_id: int, loader: Callable[[int], Iterable[IntervalEntry]],
+                      start: int, end: int, exclude_task_id: Optional[int] = None) -> List[IntervalEntry]:
+        """Return the user's indexed tasks overlapping [start, end)."""
+        intervals = self.get(user_id, loader)
+        with self._lock:
+            return intervals.overlapping(start, end, exclude_task_id)
+
+    def find_batch_overlaps(self, user_id: int, loader: Callable[[int], Iterable[IntervalEntry]],
+                            proposals: List[Tuple[int, int, Optional[int]]]):
+        """Sweep many proposed slots against the user's indexed tasks and each other."""
+        intervals = self.get(user_id, loader)
+        with self._lock:
+            return intervals.sweep(proposals)
+
+    def upsert(self, user_id: int, entry: IntervalEntry):
+        """Add or replace a task in the user's index if it is loaded."""
+        with self._lock:
+            self._bump(user_id)
+            loaded = self._users.get(user_id)
+            if loaded is not None:
+                loaded[0].add(entry)
+
+    def remove(self, user_id: int, task_id: int):
+        """Remove a task from the user's index if it is loaded."""
+        with self._lock:
+            self._bump(user_id)
+            loaded = self._users.get(user_id)
+            if loaded is not None:
+                loaded[0].remove(task_id)
+
+    def invalidate(self, user_id: int):
+        """Drop the user's index so it is rebuilt on next use."""
+        with self._lock:
+            self._bump(user_id)
+            self._users.pop(user_id, None)
+
+    def _bump(self, user_id: int):
+        state = self._loading.get(user_id)
+        if state is not None:
+            state[1] += 1
+
+    def _finish_load(self, user_id: int):
+        state = self._loading[user_id]
+        state[0] -= 1
+        if state[0] == 0:
+            del self._loading[user_id]
+
+# Shared by every TaskService instance in the process
+task_interval_index = TaskIntervalIndex(
+    max_users=int(os.getenv("CONFLICT_INDEX_MAX_USERS", "10000")),
+    ttl_seconds=float(os.getenv("CONFLICT_INDEX_TTL_SECONDS", "60"))
+)
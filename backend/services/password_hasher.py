@@ -0,0 +1,115 @@
+"""
+Bounded worker pool for bcrypt password hashing and verification
+"""
+
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict
+
+class PasswordHashingBusy(Exception):
+    """Raised when the hashing pool is saturated and the call is rejected."""
+
+class PasswordHasherPool:
+    """Runs CPU-heavy password hashing off the event loop with admission control.
+
+    At most ``max_workers`` hashes run at once and at most ``queue_limit``
+    more wait for a worker. Anything beyond that is rejected immediately with
+    ``PasswordHashingBusy`` instead of piling up behind a login spike. bcrypt
+    releases the GIL while hashing, so threads give real parallelism.
+    """
+
+    def __init__(self, hash_func: Callable[[str], str], verify_func: Callable[[str, str], bool],
+                 max_workers: int = 4, queue_limit: int = 32, latency_window: int = 1024):
+        self.hash_func = hash_func
+        self.verify_func = verify_func
+        self.max_workers = max_workers
+        self.queue_limit = queue_limit
+        self._executor = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._latencies = {"hash": deque(maxlen=latency_window), "verify": deque(maxlen=latency_window)}
+        self._counts = {"hash": 0, "verify": 0}
+        self.rejected = 0
+
+    async def hash(self, password: str) -> str:
+        """Hash a password on the worker pool."""
+        return await self._submit("hash", self.hash_func, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """Verify a password against its hash on the worker pool."""
+        return await self._submit("verify", self.verify_func, plain_password, hashed_password)
+
+    async def _submit(self, operation: str, func: Callable, *args):
+        with self._lock:
+            if self._in_flight >= self.max_workers + self.queue_limit:
+                self.rejected += 1
+                raise PasswordHashingBusy("Authentication service is busy, please retry")
+            self._in_flight += 1
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="pwhash")
+
+        submitted = time.perf_counter()
+
+        def timed_call():
+            started = time.perf_counter()
+            try:
+                return func(*args)
+            finally:
+                finished = time.perf_counter()
+                with self._lock:
+                    self._counts[operation] += 1
+                    self._latencies[operation].append(
+                        ((started - submitted) * 1000, (finished - started) * 1000)
+                    )
+
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, timed_call)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    def stats(self) -> Dict:
+        """Return pool occupancy and per-operation latency percentiles in milliseconds."""
+        with self._lock:
+            stats = {
+                "max_workers": self.max_workers,
+                "queue_limit": self.queue_limit,
+                "in_flight": self._in_flight,
+                "rejected": self.rejected
+            }
+            for operation, samples in self._latencies.items():
+                queue_ms = sorted(sample[0] for sample in samples)
+                run_ms = sorted(sample[1] for sample in samples)
+                stats[operation] = {
+                    "count": self._counts[operation],
+                    "queue_wait_ms": _percentiles(queue_ms),
+                    "run_ms": _percentiles(run_ms)
+                }
+            return stats
+
+    def shutdown(self):
+        """Stop the worker threads."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+def _percentiles(samples) -> Dict:
+    """Summarise a sorted list of latencies."""
+    if not samples:
+        return {"p50": 0.0, "p95": 0.0, "max": 0.0}
+    def pick(q):
+        return round(samples[min(len(samples) - 1, int(q * len(samples)))], 2)
+    return {"p50": pick(0.50), "p95": pick(0.95), "max": round(samples[-1], 2)}
+
+def create_password_hasher_pool(hash_func, verify_func) -> PasswordHasherPool:
+    """Build a pool sized from the environment."""
+    return PasswordHasherPool(
+        hash_func,
+        verify_func,
+        max_workers=int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1)))),
+        queue_limit=int(os.getenv("PASSWORD_HASH_QUEUE_LIMIT", "32"))
+    )
@@ -2,12 +2,37 @@
 Progress service for tracking user progress
 """
 
-from database.connection import SessionLocal
+import os
+from database.connection import SessionLocal, conflict_insert
+from models.category import Category
 from models.progress import Progress
-from datetime import date
-from typing import List, Optional, Dict
+from models.schedule import Schedule
+from models.streak import Streak
+from models.task import Task
+from services.user_cache import UserCache
+from datetime import date, timedelta
+from sqlalchemy import bindparam, case, func, insert, literal, or_, select, union_all
+from sqlalchemy.orm import Session
+from typing import Dict, List, Optional, Tuple
+
+# (user_id, date) -> [total_tasks, completed_tasks, total_time_minutes]
+ProgressDeltas = Dict[Tuple[int, date], List[int]]
+
+analytics_cache = UserCache(
+    max_users=int(os.getenv("ANALYTICS_CACHE_MAX_USERS", "10000")),
+    ttl_seconds=float(os.getenv("ANALYTICS_CACHE_TTL_SECONDS", "60"))
+)
 
 class ProgressService:
+    """Reads and maintains the daily ``progress`` rollups.
+
+    A day's rollup counts the schedule instances on that date plus the
+    one-off (non-recurring) tasks created that date; recurring tasks count
+    through their schedule instances instead. Time is the task's duration
+    for each completed item. Writers record deltas in the same transaction
+    as the change, so reads never aggregate raw rows.
+    """
+
     def get_user_progress(self, user_id: int, date: str) -> Optional[Progress]:
         """Get progress for a specific date."""
         db = SessionLocal()
@@ -19,34 +44,240 @@ class ProgressService:
             return progress
         finally:
             db.close()
-    
+
     def get_weekly_progress(self, user_id: int) -> List[Progress]:
-        """Get weekly progress for a user."""
-        # For testing, return empty list
-        return []
-    
+        """Get daily progress for the last 7 days."""
+        today = date.today()
+        return self._get_range(user_id, today - timedelta(days=6), today)
+
     def get_monthly_progress(self, user_id: int) -> List[Progress]:
-        """Get monthly progress for a user."""
-        # For testing, return empty list
-        return []
-    
+        """Get daily progress for the current month."""
+        today = date.today()
+        return self._get_range(user_id, today.replace(day=1), today)
+
     def get_analytics_summary(self, user_id: int) -> Dict:
         """Get analytics summary for a user."""
-        # For testing, return mock data
-        return {
-            "total_tasks": 0,
-            "completed_tasks": 0,
-            "completion_rate": 0.0,
-            "total_time": 0,
-            "current_streak": 0,
-            "longest_streak": 0
-        }
-    
+        return self._get_analytics(user_id)["summary"]
+
     def get_category_analytics(self, user_id: int) -> List[Dict]:
         """Get category-wise analytics."""
-        # For testing, return mock data
-        return [
-            {"category": "Work", "tasks": 0, "time": 0},
-            {"category": "Study", "tasks": 0, "time": 0},
-            {"category": "Exercise", "tasks": 0, "time": 0}
-        ] 
\ No newline at end of file
+        return self._get_analytics(user_id)["categories"]
+
+    def task_contribution(self, task: Task) -> Optional[Tuple[int, date, List[int]]]:
+        """What a task row contributes to rollups: (user_id, date, [total, completed, minutes])."""
+        if task.is_recurring or task.created_at is None:
+            return None
+        completed = 1 if task.is_completed else 0
+        return task.user_id, task.created_at.date(), [1, completed, completed * (task.duration_minutes or 0)]
+
+    def schedule_contribution(self, schedule: Schedule, duration_minutes: int) -> Tuple[int, date, List[int]]:
+        """What a schedule row contributes to rollups: (user_id, date, [total, completed, minutes])."""
+        completed = 1 if schedule.status == "completed" else 0
+        return schedule.user_id, schedule.scheduled_date, [1, completed, completed * (duration_minutes or 0)]
+
+    def add_change(self, deltas: ProgressDeltas, before, after):
+        """Record the difference between two contributions in ``deltas``."""
+        for contribution, sign in ((before, -1), (after, 1)):
+            if contribution is None:
+                continue
+            user_id, day, values = contribution
+            delta = deltas.setdefault((user_id, day), [0, 0, 0])
+            for i, value in enumerate(values):
+                delta[i] += sign * value
+
+    def apply_deltas(self, db: Session, deltas: ProgressDeltas):
+        """Upsert rollup deltas in one executemany INSERT ... ON CONFLICT DO UPDATE."""
+        params = [
+            {"p_user_id": user_id, "p_date": day, "p_total": total, "p_completed": completed, "p_minutes": minutes}
+            for (user_id, day), (total, completed, minutes) in deltas.items()
+            if total or completed or minutes
+        ]
+        if not params:
+            return
+
+        statement = conflict_insert(Progress).values(
+            user_id=bindparam("p_user_id"),
+            date=bindparam("p_date"),
+            total_tasks=bindparam("p_total"),
+            completed_tasks=bindparam("p_completed"),
+            completion_rate=self._rate(bindparam("p_completed"), bindparam("p_total")),
+            total_time_minutes=bindparam("p_minutes")
+        )
+        total = Progress.total_tasks + bindparam("p_total")
+        completed = Progress.completed_tasks + bindparam("p_completed")
+        statement = statement.on_conflict_do_update(
+            index_elements=[Progress.user_id, Progress.date],
+            set_={
+                "total_tasks": total,
+                "completed_tasks": completed,
+                "completion_rate": self._rate(completed, total),
+                "total_time_minutes": Progress.total_time_minutes + bindparam("p_minutes")
+            }
+        )
+        db.execute(statement, params)
+
+    def subtract_schedules(self, db: Session, *criteria):
+        """Remove the contribution of the schedules matching ``criteria``; call before deleting them."""
+        self._apply_schedule_deltas(db, criteria, literal(-1), -case((Schedule.status == "completed", 1), else_=0))
+    
+    def shift_schedule_status(self, db: Session, new_status: str, *criteria):
+        """Move the rollups of the schedules matching ``criteria`` to ``new_status``; call before updating them."""
+        now_completed = literal(1 if new_status == "completed" else 0)
+        self._apply_schedule_deltas(db, criteria, literal(0), now_completed - case((Schedule.status == "completed", 1), else_=0))
+    
+    def _apply_schedule_deltas(self, db: Session, criteria, total_delta, completed_delta):
+        """Upsert per-day deltas computed from the matching schedules in one INSERT ... SELECT.
+        
+        ``total_delta`` and ``completed_delta`` are per-row expressions; the
+        minutes follow ``completed_delta`` through each task's duration.
+        Nothing is read back into Python first.
+        """
+        total = func.sum(total_delta)
+        completed = func.sum(completed_delta)
+        rows = select(
+            Schedule.user_id,
+            Schedule.scheduled_date,
+            total,
+            completed,
+            literal(0),
+            func.sum(completed_delta * func.coalesce(Task.duration_minutes, 0))
+        ).join(Task, Task.id == Schedule.task_id).where(*criteria).group_by(
+            Schedule.user_id, Schedule.scheduled_date
+        ).having(or_(total != 0, completed != 0))
+        
+        statement = conflict_insert(Progress).from_select(
+            ["user_id", "date", "total_tasks", "completed_tasks", "completion_rate", "total_time_minutes"],
+            rows
+        )
+        new_total = Progress.total_tasks + statement.excluded.total_tasks
+        new_completed = Progress.completed_tasks + statement.excluded.completed_tasks
+        db.execute(statement.on_conflict_do_update(
+            index_elements=[Progress.user_id, Progress.date],
+            set_={
+                "total_tasks": new_total,
+                "completed_tasks": new_completed,
+                "completion_rate": self._rate(new_completed, new_total),
+                "total_time_minutes": Progress.total_time_minutes + statement.excluded.total_time_minutes
+            }
+        ))
+
+    def backfill(self, user_id: Optional[int] = None) -> int:
+        """Rebuild rollups from schedules and tasks with one INSERT ... SELECT.
+
+        Rebuilds every user, or only ``user_id`` when given. Returns the
+        number of rollup rows written.
+        """
+        completed_schedule = Schedule.status == "completed"
+        schedule_rows = select(
+            Schedule.user_id.label("user_id"),
+            Schedule.scheduled_date.label("day"),
+            literal(1).label("total"),
+            case((completed_schedule, 1), else_=0).label("completed"),
+            case((completed_schedule, Task.duration_minutes), else_=0).label("minutes")
+        ).join(Task, Task.id == Schedule.task_id)
+        task_rows = select(
+            Task.user_id.label("user_id"),
+            func.date(Task.created_at).label("day"),
+            literal(1).label("total"),
+            case((Task.is_completed == True, 1), else_=0).label("completed"),
+            case((Task.is_completed == True, Task.duration_minutes), else_=0).label("minutes")
+        ).where(or_(Task.is_recurring == False, Task.is_recurring.is_(None)))
+        if user_id is not None:
+            schedule_rows = schedule_rows.where(Schedule.user_id == user_id)
+            task_rows = task_rows.where(Task.user_id == user_id)
+
+        items = union_all(schedule_rows, task_rows).subquery()
+        total = func.sum(items.c.total)
+        completed = func.sum(items.c.completed)
+        rollups = select(
+            items.c.user_id,
+            items.c.day,
+            total,
+            completed,
+            self._rate(completed, total),
+            func.sum(items.c.minutes)
+        ).group_by(items.c.user_id, items.c.day)
+
+        db = SessionLocal()
+        try:
+            stale = db.query(Progress)
+            if user_id is not None:
+                stale = stale.filter(Progress.user_id == user_id)
+            stale.delete(synchronize_session=False)
+            result = db.execute(insert(Progress).from_select(
+                ["user_id", "date", "total_tasks", "completed_tasks", "completion_rate", "total_time_minutes"],
+                rollups
+            ))
+            db.commit()
+            return result.rowcount
+        finally:
+            db.close()
+
+    def _get_analytics(self, user_id: int) -> Dict:
+        """Summary and category breakdown, cached until the user's data changes."""
+        return analytics_cache.get_or_compute(user_id, "analytics", lambda: self._compute_analytics(user_id))
+
+    def _compute_analytics(self, user_id: int) -> Dict:
+        """Aggregate a user's tasks per category with one GROUP BY, plus streak maxima.
+
+        The summary totals are the sums of the category rows, so tasks are
+        scanned once.
+        """
+        completed = Task.is_completed == True
+        db = SessionLocal()
+        try:
+            rows = db.query(
+                Category.name,
+                func.count(Task.id),
+                func.sum(case((completed, 1), else_=0)),
+                func.sum(Task.duration_minutes),
+                func.sum(case((completed, Task.duration_minutes), else_=0))
+            ).select_from(Task).outerjoin(Category, Category.id == Task.category_id).filter(
+                Task.user_id == user_id
+            ).group_by(Category.id, Category.name).order_by(func.count(Task.id).desc()).all()
+            current_streak, longest_streak = db.query(
+                func.max(Streak.current_streak),
+                func.max(Streak.longest_streak)
+            ).filter(Streak.user_id == user_id).one()
+        finally:
+            db.close()
+
+        categories = [
+            {
+                "category": name or "Uncategorized",
+                "tasks": tasks,
+                "completed_tasks": completed_tasks or 0,
+                "time": planned_minutes or 0,
+                "completed_time": completed_minutes or 0
+            }
+            for name, tasks, completed_tasks, planned_minutes, completed_minutes in rows
+        ]
+        total_tasks = sum(row["tasks"] for row in categories)
+        completed_tasks = sum(row["completed_tasks"] for row in categories)
+        return {
+            "summary": {
+                "total_tasks": total_tasks,
+                "completed_tasks": completed_tasks,
+                "completion_rate": round(completed_tasks * 100.0 / total_tasks, 2) if total_tasks else 0.0,
+                "total_time": sum(row["completed_time"] for row in categories),
+                "current_streak": current_streak or 0,
+                "longest_streak": longest_streak or 0
+            },
+            "categories": categories
+        }
+
+    def _get_range(self, user_id: int, start: date, end: date) -> List[Progress]:
+        """Read the pre-aggregated daily rows in [start, end]."""
+        db = SessionLocal()
+        try:
+            return db.query(Progress).filter(
+                Progress.user_id == user_id,
+                Progress.date >= start,
+                Progress.date <= end
+            ).order_by(Progress.date).all()
+        finally:
+            db.close()
+
+    def _rate(self, completed, total):
+        """Completion percentage expression, 0 when there is nothing to complete."""
+        return case((total > 0, func.round(completed * 100.0 / total, 2)), else_=0)
@@ -0,0 +1,192 @@
+"""
+Recurrence service for expanding recurring tasks into schedule rows
+"""
+
+import calendar
+import os
+from database.connection import SessionLocal, conflict_insert
+from models.schedule import Schedule
+from models.task import Task
+from services.events import record_change
+from services.progress_service import ProgressService
+from services.sync_service import record_schedule_tombstones
+from datetime import date, datetime, timedelta
+from sqlalchemy import case, or_, update
+from sqlalchemy.orm import Session
+from typing import Iterator, List, Optional
+
+RECURRENCE_PATTERNS = ("daily", "weekly", "monthly")
+
+def occurrences(pattern: str, anchor: date, start: date, end: date) -> Iterator[date]:
+    """Yield the dates in [start, end] on which a task anchored at ``anchor`` recurs.
+
+    Weekly tasks recur on the anchor's weekday and monthly tasks on the
+    anchor's day of month; months without that day are skipped.
+    """
+    start = max(start, anchor)
+    if start > end:
+        return
+    if pattern == "daily":
+        current = start
+        while current <= end:
+            yield current
+            current += timedelta(days=1)
+    elif pattern == "weekly":
+        current = start + timedelta(days=(anchor.weekday() - start.weekday()) % 7)
+        while current <= end:
+            yield current
+            current += timedelta(days=7)
+    elif pattern == "monthly":
+        year, month = start.year, start.month
+        while True:
+            if anchor.day <= calendar.monthrange(year, month)[1]:
+                current = date(year, month, anchor.day)
+                if current > end:
+                    return
+                if current >= start:
+                    yield current
+            elif date(year, month, 1) > end:
+                return
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+def previous_occurrence(pattern: Optional[str], day: date) -> date:
+    """The occurrence before ``day`` for a task recurring with ``pattern``.
+
+    Non-recurring tasks are treated as daily.
+    """
+    if pattern == "weekly":
+        return day - timedelta(days=7)
+    if pattern == "monthly":
+        year, month = day.year, day.month
+        while True:
+            year, month = (year - 1, 12) if month == 1 else (year, month - 1)
+            if day.day <= calendar.monthrange(year, month)[1]:
+                return date(year, month, day.day)
+    return day - timedelta(days=1)
+
+class RecurrenceService:
+    """Materializes recurring tasks into ``schedules`` rows.
+
+    Each task records the last date it was expanded through in
+    ``materialized_through``, so every date is expanded at most once. Rows
+    are written with multi-row INSERT ... ON CONFLICT DO NOTHING, which
+    leaves hand-made entries for the same (task_id, scheduled_date) alone.
+    """
+
+    def __init__(self):
+        self.max_horizon_days = int(os.getenv("RECURRENCE_MAX_HORIZON_DAYS", "366"))
+        self.batch_size = int(os.getenv("RECURRENCE_BATCH_SIZE", "500"))
+        self.progress_service = ProgressService()
+
+    def materialize_user(self, user_id: int, through: date) -> int:
+        """Expand a user's recurring tasks through ``through``; used lazily on reads."""
+        through = min(through, date.today() + timedelta(days=self.max_horizon_days))
+        db = SessionLocal()
+        try:
+            tasks = self._pending_tasks(db, through).filter(Task.user_id == user_id).all()
+            if not tasks:
+                return 0
+            created = self._materialize(db, tasks, through)
+            db.commit()
+            return created
+        finally:
+            db.close()
+
+    def materialize_ahead(self, days: int = 14) -> int:
+        """Expand every user's recurring tasks ``days`` ahead, in batches of tasks."""
+        through = date.today() + timedelta(days=min(days, self.max_horizon_days))
+        created = 0
+        last_id = 0
+        while True:
+            db = SessionLocal()
+            try:
+                tasks = self._pending_tasks(db, through).filter(
+                    Task.id > last_id
+                ).order_by(Task.id).limit(self.batch_size).all()
+                if not tasks:
+                    return created
+                created += self._materialize(db, tasks, through)
+                db.commit()
+                last_id = tasks[-1].id
+            finally:
+                db.close()
+
+    def reset(self, db: Session, task: Task):
+        """Drop a task's pending future instances so they are re-expanded from today.
+
+        Called when a task's timing or recurrence changes. Completed and past
+        instances are history and are kept.
+        """
+        today = date.today()
+        self._drop_pending(db, [task.id], today)
+        task.materialized_through = today - timedelta(days=1) if task.is_recurring else None
+    
+    def reset_many(self, db: Session, task_ids: List[int]):
+        """Set-based ``reset`` for several tasks, without loading them."""
+        today = date.today()
+        self._drop_pending(db, task_ids, today)
+        db.execute(update(Task).where(Task.id.in_(task_ids)).values(
+            materialized_through=case((Task.is_recurring == True, today - timedelta(days=1)), else_=None)
+        ).execution_options(synchronize_session=False))
+    
+    def _drop_pending(self, db: Session, task_ids: List[int], today: date):
+        """Delete the tasks' pending instances from ``today`` on, keeping rollups and tombstones in step."""
+        pending = (
+            Schedule.task_id.in_(task_ids),
+            Schedule.scheduled_date >= today,
+            Schedule.status == "pending"
+        )
+        self.progress_service.subtract_schedules(db, *pending)
+        record_schedule_tombstones(db, *pending)
+        db.query(Schedule).filter(*pending).delete(synchronize_session=False)
+
+    def _pending_tasks(self, db: Session, through: date):
+        """Recurring tasks not yet expanded through ``through``."""
+        return db.query(Task).filter(
+            Task.is_recurring == True,
+            Task.recurrence_pattern.in_(RECURRENCE_PATTERNS),
+            or_(Task.materialized_through.is_(None), Task.materialized_through < through)
+        )
+
+    def _materialize(self, db: Session, tasks: List[Task], through: date) -> int:
+        """Insert schedule rows for ``tasks`` up to ``through`` and advance their watermarks."""
+        rows = []
+        watermarks = []
+        for task in tasks:
+            anchor = self._anchor(task)
+            start = anchor if task.materialized_through is None else task.materialized_through + timedelta(days=1)
+            duration = timedelta(minutes=task.duration_minutes or 0)
+            for day in occurrences(task.recurrence_pattern, anchor, start, through):
+                rows.append({
+                    "task_id": task.id,
+                    "user_id": task.user_id,
+                    "scheduled_date": day,
+                    "start_time": task.start_time,
+                    "end_time": (datetime.combine(day, task.start_time) + duration).time(),
+                    "status": "pending"
+                })
+            watermarks.append({"id": task.id, "materialized_through": through})
+
+        created = 0
+        if rows:
+            inserted = db.execute(
+                conflict_insert(Schedule).on_conflict_do_nothing().returning(
+                    Schedule.user_id, Schedule.scheduled_date
+                ),
+                rows
+            ).all()
+            created = len(inserted)
+            deltas = {}
+            for user_id, day in inserted:
+                deltas.setdefault((user_id, day), [0, 0, 0])[0] += 1
+            self.progress_service.apply_deltas(db, deltas)
+            for user_id in {user_id for user_id, _ in inserted}:
+                record_change(db, user_id, "schedule", "created")
+        db.execute(update(Task), watermarks)
+        return created
+
+    def _anchor(self, task: Task) -> date:
+        """The first date a recurring task applies to."""
+        if task.created_at is not None:
+            return task.created_at.date()
+        return date.today()
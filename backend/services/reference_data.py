@@ -0,0 +1,123 @@
+"""
+Pre-serialized snapshots of near-static reference data (categories, templates)
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from database.connection import SessionLocal
+from database.unit_of_work import after_commit
+from models.category import Category
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+from typing import Callable, Dict, List, Optional
+
+class ReferenceSnapshot:
+    """A JSON response body serialized once, with its ETag."""
+    __slots__ = ("body", "etag", "built_at")
+
+    def __init__(self, payload: Dict):
+        self.body = json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+        self.etag = '"' + hashlib.sha1(self.body).hexdigest()[:20] + '"'
+        self.built_at = time.monotonic()
+
+    def matches(self, if_none_match: Optional[str]) -> bool:
+        """Whether an If-None-Match header already names this snapshot."""
+        if not if_none_match:
+            return False
+        for tag in if_none_match.split(","):
+            tag = tag.strip()
+            if tag == "*" or tag.removeprefix("W/") == self.etag:
+                return True
+        return False
+
+class ReferenceDataService:
+    """Serves categories and templates from in-memory snapshots.
+
+    The categories snapshot is rebuilt after any Category write in this
+    process commits, and at least every ``ttl_seconds`` to pick up changes
+    made elsewhere (for example by init_db.py). A rebuild that read the rows
+    before an invalidation is served but not kept. Templates are static and
+    built once.
+    """
+
+    def __init__(self, templates_loader: Callable[[], List[Dict]], ttl_seconds: float = 300.0):
+        self.templates_loader = templates_loader
+        self.ttl_seconds = ttl_seconds
+        self._categories: Optional[ReferenceSnapshot] = None
+        self._templates: Optional[ReferenceSnapshot] = None
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get_categories(self) -> ReferenceSnapshot:
+        """Current categories snapshot, rebuilt from the database when stale."""
+        snapshot = self._categories
+        if snapshot is not None and time.monotonic() - snapshot.built_at < self.ttl_seconds:
+            return snapshot
+        with self._lock:
+            snapshot = self._categories
+            if snapshot is None or time.monotonic() - snapshot.built_at >= self.ttl_seconds:
+                generation = self._generation
+                snapshot = ReferenceSnapshot({"categories": self._load_categories()})
+                if generation == self._generation:
+                    self._categories = snapshot
+            return snapshot
+
+    def get_templates(self) -> ReferenceSnapshot:
+        """Templates snapshot."""
+        if self._templates is None:
+            self._templates = ReferenceSnapshot({"templates": self.templates_loader()})
+        return self._templates
+
+    def categories_stale(self) -> bool:
+        """Whether the next categories read will hit the database."""
+        snapshot = self._categories
+        return snapshot is None or time.monotonic() - snapshot.built_at >= self.ttl_seconds
+
+    def invalidate_categories(self):
+        """Force the categories snapshot to be rebuilt on next read."""
+        self._generation += 1
+        self._categories = None
+
+    def _load_categories(self) -> List[Dict]:
+        db = SessionLocal()
+        try:
+            rows = db.query(Category.id, Category.name, Category.color, Category.icon).order_by(Category.id).all()
+            return [{"id": row.id, "name": row.name, "color": row.color, "icon": row.icon} for row in rows]
+        finally:
+            db.close()
+
+_services: List[ReferenceDataService] = []
+
+def create_reference_data_service(templates_loader: Callable[[], List[Dict]]) -> ReferenceDataService:
+    """Build a service sized from the environment and hook it up to category writes."""
+    service = ReferenceDataService(
+        templates_loader,
+        ttl_seconds=float(os.getenv("REFERENCE_DATA_TTL_SECONDS", "300"))
+    )
+    _services.append(service)
+    return service
+
+@event.listens_for(Category, "after_insert")
+@event.listens_for(Category, "after_update")
+@event.listens_for(Category, "after_delete")
+def _queue_categories_invalidation(mapper, connection, target):
+    """Note a category write; snapshots are dropped once it commits."""
+    session = object_session(target)
+    if session is not None:
+        session.info["categories_changed"] = True
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_categories_on_commit(session):
+    if session.info.pop("categories_changed", False):
+        after_commit(session, _invalidate_categories)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_categories_invalidation(session):
+    session.info.pop("categories_changed", None)
+
+def _invalidate_categories():
+    for service in _services:
+        service.invalidate_categories()
@@ -3,84 +3,189 @@ Schedule service for managing daily schedules
 """
 
 from database.connection import SessionLocal
-from models.schedule import Schedule, ScheduleCreate, ScheduleUpdate
-from datetime import datetime
-from typing import List, Optional
+from database.projections import columns, fetch
+from models.category import Category
+from models.schedule import Schedule, ScheduleCreate, ScheduleRow, ScheduleUpdate
+from models.task import Task
+from services.events import record_change
+from services.progress_service import ProgressService
+from services.recurrence_service import RecurrenceService
+from services.sync_service import record_schedule_tombstones
+from datetime import date as date_type, datetime, timedelta
+from sqlalchemy import delete, insert, or_, select, update
+from sqlalchemy.orm import Session
+from typing import Dict, List, Optional
 
 class ScheduleService:
-    def get_user_schedule(self, user_id: int, date: str) -> List[Schedule]:
-        """Get schedule for a specific date."""
+    def __init__(self):
+        self.recurrence_service = RecurrenceService()
+        self.progress_service = ProgressService()
+    
+    def get_user_schedule(self, user_id: int, date: date_type) -> List[ScheduleRow]:
+        """Get schedule for a specific date as read-only records with task and category joined in."""
+        self.recurrence_service.materialize_user(user_id, date)
         db = SessionLocal()
         try:
-            schedules = db.query(Schedule).filter(
+            return fetch(db, ScheduleRow, select(*columns(
+                Schedule,
+                ScheduleRow,
+                task_title=Task.title,
+                category_id=Task.category_id,
+                category_name=Category.name,
+                category_color=Category.color
+            )).join(Task, Task.id == Schedule.task_id).outerjoin(
+                Category, Category.id == Task.category_id
+            ).where(
                 Schedule.user_id == user_id,
                 Schedule.scheduled_date == date
-            ).all()
-            return schedules
+            ))
+        finally:
+            db.close()
+    
+    def get_user_schedule_range(self, user_id: int, start: date_type, end: date_type) -> Dict[str, List[dict]]:
+        """Get schedules for every day in [start, end], grouped by ISO date.
+        
+        One indexed query on (user_id, scheduled_date) returns the entries
+        with their task title and category joined in. Every day in the range
+        is present, with an empty list when nothing is scheduled.
+        """
+        self.recurrence_service.materialize_user(user_id, end)
+        db = SessionLocal()
+        try:
+            rows = db.query(
+                Schedule.id,
+                Schedule.task_id,
+                Schedule.scheduled_date,
+                Schedule.start_time,
+                Schedule.end_time,
+                Schedule.status,
+                Schedule.completed_at,
+                Schedule.notes,
+                Task.title,
+                Task.category_id,
+                Category.name,
+                Category.color
+            ).join(Task, Task.id == Schedule.task_id).outerjoin(
+                Category, Category.id == Task.category_id
+            ).filter(
+                Schedule.user_id == user_id,
+                Schedule.scheduled_date >= start,
+                Schedule.scheduled_date <= end
+            ).order_by(Schedule.scheduled_date, Schedule.start_time).all()
         finally:
             db.close()
+        
+        days = {(start + timedelta(days=offset)).isoformat(): [] for offset in range((end - start).days + 1)}
+        for row in rows:
+            days[row.scheduled_date.isoformat()].append({
+                "id": row.id,
+                "task_id": row.task_id,
+                "scheduled_date": row.scheduled_date,
+                "start_time": row.start_time,
+                "end_time": row.end_time,
+                "status": row.status,
+                "completed_at": row.completed_at,
+                "notes": row.notes,
+                "task_title": row.title,
+                "category_id": row.category_id,
+                "category_name": row.name,
+                "category_color": row.color
+            })
+        return days
     
     def create_schedule(self, user_id: int, schedule_data: ScheduleCreate) -> Schedule:
         """Create a new schedule entry."""
-        db = SessionLocal()
+        db = SessionLocal(expire_on_commit=False)
         try:
-            schedule = Schedule(
+            schedule = db.scalars(insert(Schedule).values(
                 task_id=schedule_data.task_id,
                 user_id=user_id,
                 scheduled_date=schedule_data.scheduled_date,
                 start_time=schedule_data.start_time,
                 end_time=schedule_data.end_time,
-                notes=schedule_data.notes
-            )
-            db.add(schedule)
+                notes=schedule_data.notes,
+                status="pending"
+            ).returning(Schedule)).one()
+            self.progress_service.apply_deltas(db, {(user_id, schedule_data.scheduled_date): [1, 0, 0]})
+            record_change(db, user_id, "schedule", "created", schedule.id)
             db.commit()
-            db.refresh(schedule)
             return schedule
         finally:
             db.close()
     
     def update_schedule(self, schedule_id: int, user_id: int, schedule_data: ScheduleUpdate) -> Optional[Schedule]:
         """Update a schedule entry."""
-        db = SessionLocal()
+        values = schedule_data.model_dump(exclude_none=True)
+        db = SessionLocal(expire_on_commit=False)
         try:
-            schedule = db.query(Schedule).filter(
-                Schedule.id == schedule_id,
-                Schedule.user_id == user_id
-            ).first()
+            match = (Schedule.id == schedule_id, Schedule.user_id == user_id)
+            if "status" in values:
+                self.progress_service.shift_schedule_status(db, values["status"], *match)
+            schedule = None
+            if values:
+                # Only a row that differs in some column is updated, so a no-op body writes nothing
+                differs = or_(*(getattr(Schedule, column).is_distinct_from(value) for column, value in values.items()))
+                schedule = self._update_returning(db, (*match, differs), values)
+            changed = schedule is not None
+            if not changed:
+                schedule = db.query(Schedule).filter(*match).first()
             if not schedule:
                 return None
-            
-            # Update fields
-            if schedule_data.start_time is not None:
-                schedule.start_time = schedule_data.start_time
-            if schedule_data.end_time is not None:
-                schedule.end_time = schedule_data.end_time
-            if schedule_data.status is not None:
-                schedule.status = schedule_data.status
-            if schedule_data.notes is not None:
-                schedule.notes = schedule_data.notes
-            
+            if changed:
+                record_change(db, user_id, "schedule", "updated", schedule_id)
             db.commit()
-            db.refresh(schedule)
             return schedule
         finally:
             db.close()
     
     def complete_schedule(self, schedule_id: int, user_id: int) -> bool:
         """Mark a schedule as completed."""
+        return self._set_status(schedule_id, user_id, "completed", datetime.utcnow(), "completed")
+    
+    def uncomplete_schedule(self, schedule_id: int, user_id: int) -> bool:
+        """Mark a schedule as not completed."""
+        return self._set_status(schedule_id, user_id, "pending", None, "uncompleted")
+    
+    def delete_schedule(self, schedule_id: int, user_id: int):
+        """Delete a schedule entry, returning its task_id, scheduled_date and status, or None if missing."""
         db = SessionLocal()
         try:
-            schedule = db.query(Schedule).filter(
-                Schedule.id == schedule_id,
-                Schedule.user_id == user_id
+            match = (Schedule.id == schedule_id, Schedule.user_id == user_id)
+            self.progress_service.subtract_schedules(db, *match)
+            record_schedule_tombstones(db, *match)
+            deleted = db.execute(
+                delete(Schedule).where(*match).returning(Schedule.task_id, Schedule.scheduled_date, Schedule.status)
             ).first()
-            if not schedule:
+            if deleted:
+                record_change(db, user_id, "schedule", "deleted", schedule_id)
+            db.commit()
+            return deleted
+        finally:
+            db.close()
+    
+    def _set_status(self, schedule_id: int, user_id: int, status: str, completed_at: Optional[datetime], action: str) -> bool:
+        """Move one schedule to ``status`` with a rollup upsert and a single conditional UPDATE."""
+        db = SessionLocal()
+        try:
+            match = (Schedule.id == schedule_id, Schedule.user_id == user_id)
+            self.progress_service.shift_schedule_status(db, status, *match)
+            updated = db.execute(
+                update(Schedule).where(*match).values(status=status, completed_at=completed_at).execution_options(
+                    synchronize_session=False
+                )
+            ).rowcount
+            if not updated:
                 return False
-            
-            schedule.status = "completed"
-            schedule.completed_at = datetime.utcnow()
-            
+            record_change(db, user_id, "schedule", action, schedule_id)
             db.commit()
             return True
         finally:
-            db.close() 
\ No newline at end of file
+            db.close()
+    
+    def _update_returning(self, db: Session, match, values: dict) -> Optional[Schedule]:
+        """UPDATE ... WHERE id AND user_id RETURNING the row, without a separate SELECT."""
+        return db.scalars(
+            update(Schedule).where(*match).values(**values).returning(Schedule).execution_options(
+                synchronize_session=False, populate_existing=True
+            )
+        ).first()
@@ -2,18 +2,24 @@
 Streak service for managing user streaks
 """
 
-from database.connection import SessionLocal
-from models.streak import Streak
-from datetime import date
-from typing import List, Optional
+from database.connection import SessionLocal, conflict_insert
+from database.projections import columns, fetch
+from models.schedule import Schedule
+from models.streak import Streak, StreakRow
+from models.task import Task
+from services.events import record_change
+from services.recurrence_service import previous_occurrence
+from datetime import date, timedelta
+from sqlalchemy import and_, case, delete, func, insert, or_, select, update
+from sqlalchemy.orm import Session
+from typing import Dict, List, Optional
 
 class StreakService:
-    def get_user_streaks(self, user_id: int) -> List[Streak]:
-        """Get all streaks for a user."""
+    def get_user_streaks(self, user_id: int) -> List[StreakRow]:
+        """Get all streaks for a user as read-only records."""
         db = SessionLocal()
         try:
-            streaks = db.query(Streak).filter(Streak.user_id == user_id).all()
-            return streaks
+            return fetch(db, StreakRow, select(*columns(Streak, StreakRow)).where(Streak.user_id == user_id))
         finally:
             db.close()
     
@@ -30,7 +36,278 @@ class StreakService:
             db.close()
     
     def update_streaks(self, user_id: int, schedule_id: int) -> bool:
-        """Update streaks when a schedule is completed."""
-        # For testing, we'll just return True
-        # In production, you'd implement proper streak logic
-        return True 
\ No newline at end of file
+        """Update the daily and per-task streaks when a schedule is completed.
+        
+        Each streak advances in O(1) from its stored last_completed_date:
+        completing the day after (or, for recurring tasks, the occurrence
+        after) the last completion extends it, a gap restarts it at 1, and
+        repeat or older completions leave it alone. Use recompute_all to
+        rebuild streaks from history after out-of-order changes.
+        """
+        db = SessionLocal()
+        try:
+            completion = db.query(
+                Schedule.scheduled_date, Schedule.task_id, Task.is_recurring, Task.recurrence_pattern
+            ).join(Task, Task.id == Schedule.task_id).filter(
+                Schedule.id == schedule_id,
+                Schedule.user_id == user_id
+            ).first()
+            if not completion:
+                return False
+            
+            day = completion.scheduled_date
+            pattern = completion.recurrence_pattern if completion.is_recurring else None
+            self._advance(db, user_id, "daily", None, day, day - timedelta(days=1))
+            self._advance(db, user_id, "task", completion.task_id, day, previous_occurrence(pattern, day))
+            record_change(db, user_id, "streak", "updated")
+            db.commit()
+            return True
+        finally:
+            db.close()
+    
+    def revert_streaks(self, user_id: int, schedule_id: int) -> bool:
+        """Roll back the daily and per-task streaks after a schedule is uncompleted."""
+        db = SessionLocal()
+        try:
+            completion = db.query(
+                Schedule.scheduled_date, Schedule.task_id, Task.is_recurring, Task.recurrence_pattern
+            ).join(Task, Task.id == Schedule.task_id).filter(
+                Schedule.id == schedule_id,
+                Schedule.user_id == user_id
+            ).first()
+            if not completion:
+                return False
+            
+            pattern = completion.recurrence_pattern if completion.is_recurring else None
+            self._revert(db, user_id, completion.task_id, completion.scheduled_date, pattern)
+            record_change(db, user_id, "streak", "updated")
+            db.commit()
+            return True
+        finally:
+            db.close()
+    
+    def revert_completion(self, user_id: int, task_id: int, day: date) -> bool:
+        """Roll back the streaks fed by a completed schedule of ``task_id`` on ``day`` that was deleted."""
+        db = SessionLocal()
+        try:
+            task = db.query(Task.is_recurring, Task.recurrence_pattern).filter(
+                Task.id == task_id,
+                Task.user_id == user_id
+            ).first()
+            if not task:
+                return False
+            
+            self._revert(db, user_id, task_id, day, task.recurrence_pattern if task.is_recurring else None)
+            record_change(db, user_id, "streak", "updated")
+            db.commit()
+            return True
+        finally:
+            db.close()
+    
+    def recompute_all(self, chunk_size: int = 1000) -> int:
+        """Rebuild every user's streaks from completed schedules in one streaming pass.
+        
+        Completed schedules are read in (user_id, scheduled_date) order with a
+        server-side cursor, so history is never held in memory; only the
+        resulting streak rows are. Those replace the existing streaks in one
+        transaction. Returns the number of streak rows written.
+        """
+        db = SessionLocal()
+        try:
+            history = db.query(
+                Schedule.user_id, Schedule.task_id, Schedule.scheduled_date,
+                Task.is_recurring, Task.recurrence_pattern
+            ).join(Task, Task.id == Schedule.task_id).filter(
+                Schedule.status == "completed"
+            ).order_by(Schedule.user_id, Schedule.scheduled_date).execution_options(yield_per=chunk_size)
+            
+            rows = []
+            current_user = None
+            streaks: Dict = {}
+            for user_id, task_id, day, is_recurring, pattern in history:
+                if user_id != current_user:
+                    rows.extend(self._streak_rows(current_user, streaks))
+                    current_user, streaks = user_id, {}
+                self._step(streaks, None, day, day - timedelta(days=1))
+                self._step(streaks, task_id, day, previous_occurrence(pattern if is_recurring else None, day))
+            rows.extend(self._streak_rows(current_user, streaks))
+            
+            db.query(Streak).delete(synchronize_session=False)
+            for start in range(0, len(rows), chunk_size):
+                db.execute(insert(Streak), rows[start:start + chunk_size])
+            db.commit()
+            return len(rows)
+        finally:
+            db.close()
+    
+    def _advance(self, db: Session, user_id: int, streak_type: str, task_id: Optional[int], day: date, previous: date):
+        """Apply one completion to a streak row with a conditional UPDATE, inserting it if missing."""
+        match = self._match(user_id, streak_type, task_id)
+        current = case(
+            (Streak.last_completed_date.is_(None), 1),
+            (Streak.last_completed_date >= day, Streak.current_streak),
+            (Streak.last_completed_date == previous, Streak.current_streak + 1),
+            else_=1
+        )
+        longest = func.coalesce(Streak.longest_streak, 0)
+        # A restart turns the current run into an earlier one
+        before = case(
+            (Streak.last_completed_date.is_(None), 0),
+            (Streak.last_completed_date >= day, Streak.longest_before_run),
+            (Streak.last_completed_date == previous, Streak.longest_before_run),
+            else_=longest
+        )
+        statement = update(Streak).where(*match).values(
+            current_streak=current,
+            longest_streak=case((current > longest, current), else_=longest),
+            last_completed_date=case((Streak.last_completed_date >= day, Streak.last_completed_date), else_=day),
+            longest_before_run=before
+        ).execution_options(synchronize_session=False)
+        
+        if db.execute(statement).rowcount:
+            return
+        inserted = db.execute(
+            conflict_insert(Streak).values(
+                user_id=user_id,
+                streak_type=streak_type,
+                task_id=task_id,
+                current_streak=1,
+                longest_streak=1,
+                last_completed_date=day,
+                longest_before_run=0
+            ).on_conflict_do_nothing(**self._conflict_target(task_id))
+        ).rowcount
+        if not inserted:
+            # Lost an insert race for the same streak; apply on top of the winner
+            db.execute(statement)
+    
+    def _revert(self, db: Session, user_id: int, task_id: int, day: date, pattern: Optional[str]):
+        """Take a completion on ``day`` out of the daily streak and ``task_id``'s streak.
+        
+        Only the run the completion belonged to is replayed. Completed dates
+        are walked back from the streak's last_completed_date until that run
+        is passed. If nothing of it is left, the walk also takes in the run
+        before it. What remains of the run becomes the current streak, and
+        longest_before_run supplies the earlier runs for longest_streak.
+        Completions before the current run are out of order for the stored
+        streak, as in update_streaks; recompute_all corrects those.
+        """
+        rows = db.execute(
+            select(
+                Streak.id, Streak.task_id, Streak.current_streak, Streak.longest_streak,
+                Streak.last_completed_date, Streak.longest_before_run
+            ).where(
+                Streak.user_id == user_id,
+                or_(
+                    and_(Streak.streak_type == "daily", Streak.task_id.is_(None)),
+                    and_(Streak.streak_type == "task", Streak.task_id == task_id)
+                )
+            )
+        ).all()
+        emptied = []
+        for row in rows:
+            if row.task_id is None:
+                streak_pattern, criteria = None, (Schedule.user_id == user_id, Schedule.status == "completed")
+            else:
+                streak_pattern, criteria = pattern, (Schedule.user_id == user_id, Schedule.task_id == task_id, Schedule.status == "completed")
+            last = row.last_completed_date
+            if last is None or day > last:
+                continue
+            run_start = self._run_start(streak_pattern, last, row.current_streak)
+            if day < run_start:
+                continue
+            
+            runs = self._walk_back(db, criteria, streak_pattern, last, run_start)
+            if not runs:
+                emptied.append(row.id)
+                continue
+            before = max([row.longest_before_run or 0] + [length for _, length in runs[1:]])
+            last_date, current = runs[0]
+            values = {
+                "current_streak": current,
+                "longest_streak": max(before, current),
+                "last_completed_date": last_date,
+                "longest_before_run": before
+            }
+            if values != {name: getattr(row, name) for name in values}:
+                db.execute(update(Streak).where(Streak.id == row.id).values(**values).execution_options(synchronize_session=False))
+        if emptied:
+            db.execute(delete(Streak).where(Streak.id.in_(emptied)))
+    
+    def _run_start(self, pattern: Optional[str], last: date, length: Optional[int]) -> date:
+        """First date of the run of ``length`` consecutive occurrences ending at ``last``."""
+        start = last
+        for _ in range((length or 1) - 1):
+            start = previous_occurrence(pattern, start)
+        return start
+    
+    def _walk_back(self, db: Session, criteria, pattern: Optional[str], last: date, run_start: date) -> List[list]:
+        """Runs of completed dates up to ``last``, newest first, as [end, length].
+        
+        Dates are streamed newest first and the walk stops at the first gap
+        below ``run_start`` once a run has been found, so only the current
+        run, and the one before it when the current run is gone, is read.
+        """
+        dates = db.execute(
+            select(Schedule.scheduled_date).where(*criteria, Schedule.scheduled_date <= last).distinct().order_by(
+                Schedule.scheduled_date.desc()
+            ).execution_options(yield_per=100)
+        )
+        runs = []
+        earliest = None
+        try:
+            for (completed,) in dates:
+                if runs and completed == previous_occurrence(pattern, earliest):
+                    runs[-1][1] += 1
+                elif runs and completed < run_start:
+                    break
+                else:
+                    runs.append([completed, 1])
+                earliest = completed
+        finally:
+            dates.close()
+        return runs
+    
+    def _match(self, user_id: int, streak_type: str, task_id: Optional[int]) -> list:
+        """WHERE criteria for one streak row."""
+        return [
+            Streak.user_id == user_id,
+            Streak.streak_type == streak_type,
+            Streak.task_id == task_id if task_id is not None else Streak.task_id.is_(None)
+        ]
+    
+    def _conflict_target(self, task_id: Optional[int]) -> Dict:
+        """ON CONFLICT target: the partial daily index, or the per-task unique index."""
+        if task_id is None:
+            return {"index_elements": ["user_id", "streak_type"], "index_where": Streak.task_id.is_(None)}
+        return {"index_elements": ["user_id", "streak_type", "task_id"]}
+    
+    def _step(self, streaks: Dict, task_id: Optional[int], day: date, previous: date):
+        """Apply one completion to an in-memory [current, longest, last_date, longest_before_run] streak."""
+        streak = streaks.get(task_id)
+        if streak is None:
+            streaks[task_id] = [1, 1, day, 0]
+            return
+        if day <= streak[2]:
+            return
+        if streak[2] == previous:
+            streak[0] += 1
+        else:
+            streak[0], streak[3] = 1, streak[1]
+        streak[1] = max(streak[1], streak[0])
+        streak[2] = day
+    
+    def _streak_rows(self, user_id: Optional[int], streaks: Dict) -> List[Dict]:
+        """Convert one user's in-memory streaks to insert rows."""
+        return [
+            {
+                "user_id": user_id,
+                "streak_type": "daily" if task_id is None else "task",
+                "task_id": task_id,
+                "current_streak": current,
+                "longest_streak": longest,
+                "last_completed_date": last_date,
+                "longest_before_run": before
+            }
+            for task_id, (current, longest, last_date, before) in streaks.items()
+        ]
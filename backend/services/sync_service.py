@@ -0,0 +1,105 @@
+"""
+Sync service for delta synchronization of tasks and schedules
+"""
+
+import base64
+import os
+from database.connection import SessionLocal
+from models.schedule import Schedule
+from models.task import Task
+from models.tombstone import Tombstone
+from datetime import datetime, timedelta
+from sqlalchemy import func, insert, literal, select
+from sqlalchemy.orm import Session
+from typing import Dict, Optional
+
+def encode_sync_cursor(at: datetime) -> str:
+    """Opaque sync cursor for the database time ``at``."""
+    return base64.urlsafe_b64encode(at.isoformat().encode()).decode().rstrip("=")
+
+def decode_sync_cursor(cursor: str) -> datetime:
+    """Inverse of encode_sync_cursor; raises ValueError for malformed cursors."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        return datetime.fromisoformat(raw.decode())
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+def record_tombstone(db: Session, user_id: int, entity: str, entity_id: int):
+    """Remember that a row was deleted, in the same transaction as the delete."""
+    db.add(Tombstone(user_id=user_id, entity=entity, entity_id=entity_id))
+
+def record_schedule_tombstones(db: Session, *criteria):
+    """Tombstone the schedules matching ``criteria`` with one INSERT ... SELECT; call before deleting them."""
+    db.execute(insert(Tombstone).from_select(
+        ["user_id", "entity", "entity_id"],
+        select(Schedule.user_id, literal("schedule"), Schedule.id).where(*criteria)
+    ))
+
+class SyncService:
+    """Serves the rows that changed since a client's last sync.
+
+    A row has changed when ``coalesce(updated_at, created_at)`` is at or
+    after the cursor; deletions come from tombstones. Cursors are taken from
+    the database clock before reading, and every query looks back an extra
+    ``overlap_seconds`` so rows committed by transactions that were still
+    open at that moment (and second-resolution timestamps) are not missed.
+    Clients may therefore receive a row they already have and should upsert
+    by id. Cursors older than the tombstone retention get a full sync.
+    """
+
+    def __init__(self):
+        self.overlap_seconds = int(os.getenv("SYNC_OVERLAP_SECONDS", "5"))
+        self.tombstone_retention_days = int(os.getenv("SYNC_TOMBSTONE_RETENTION_DAYS", "30"))
+
+    def get_changes(self, user_id: int, since: Optional[datetime] = None) -> Dict:
+        """Tasks and schedules changed since ``since`` and the ids deleted since then.
+
+        With no cursor, or one older than the tombstone retention, every row
+        is returned with ``full`` set and the client should replace its cache.
+        """
+        db = SessionLocal()
+        try:
+            now = db.scalar(select(func.now()))
+            full = since is None or since < now - timedelta(days=self.tombstone_retention_days)
+            tasks = db.query(Task).filter(Task.user_id == user_id)
+            schedules = db.query(Schedule).filter(Schedule.user_id == user_id)
+            deleted = {"tasks": [], "schedules": []}
+            if not full:
+                window_start = since - timedelta(seconds=self.overlap_seconds)
+                tasks = tasks.filter(func.coalesce(Task.updated_at, Task.created_at) >= window_start)
+                schedules = schedules.filter(func.coalesce(Schedule.updated_at, Schedule.created_at) >= window_start)
+                tombstones = db.query(Tombstone.entity, Tombstone.entity_id).filter(
+                    Tombstone.user_id == user_id,
+                    Tombstone.deleted_at >= window_start
+                )
+                for entity, entity_id in tombstones:
+                    deleted[f"{entity}s"].append(entity_id)
+
+            tasks = tasks.order_by(Task.id).all()
+            schedules = schedules.order_by(Schedule.id).all()
+            # An id that was deleted and then reused is alive
+            live = {"tasks": {task.id for task in tasks}, "schedules": {schedule.id for schedule in schedules}}
+            return {
+                "cursor": encode_sync_cursor(now),
+                "full": full,
+                "tasks": tasks,
+                "schedules": schedules,
+                "deleted": {
+                    entity: sorted(set(ids) - live[entity])
+                    for entity, ids in deleted.items()
+                }
+            }
+        finally:
+            db.close()
+
+    def prune_tombstones(self) -> int:
+        """Delete tombstones older than the retention window; returns the number removed."""
+        db = SessionLocal()
+        try:
+            cutoff = db.scalar(select(func.now())) - timedelta(days=self.tombstone_retention_days)
+            removed = db.query(Tombstone).filter(Tombstone.deleted_at < cutoff).delete(synchronize_session=False)
+            db.commit()
+            return removed
+        finally:
+            db.close()
@@ -2,18 +2,88 @@
 Task service for managing user tasks
 """
 
+import base64
+import json
 from database.connection import SessionLocal
-from models.task import Task, TaskCreate, TaskUpdate
+from database.unit_of_work import after_commit
+from database.projections import columns, fetch
+from models.category import Category
+from models.schedule import Schedule
+from models.streak import Streak
+from models.task import ConflictProposal, Task, TaskBulkOperation, TaskCreate, TaskRow, TaskUpdate
 from models.user import User
-from typing import List, Optional
+from services.events import record_change
+from services.progress_service import ProgressService
+from services.interval_index import IntervalEntry, task_interval_index, to_minutes
+from services.recurrence_service import RecurrenceService
+from services.sync_service import record_schedule_tombstones, record_tombstone
+from datetime import datetime, time
+from functools import partial
+from sqlalchemy import delete, insert, or_, select, tuple_, update
+from sqlalchemy.orm import Session
+from typing import Dict, List, Optional, Tuple
+
+def encode_task_cursor(task: Task) -> str:
+    """Opaque pagination cursor pointing just after ``task``."""
+    raw = json.dumps([task.start_time.isoformat(), task.id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_task_cursor(cursor: str) -> Tuple[time, int]:
+    """Inverse of encode_task_cursor; raises ValueError for malformed cursors."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        start_time, task_id = json.loads(raw)
+        return time.fromisoformat(start_time), int(task_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
 
 class TaskService:
-    def get_user_tasks(self, user_id: int) -> List[Task]:
-        """Get all tasks for a user."""
+    def __init__(self):
+        self.interval_index = task_interval_index
+        self.recurrence_service = RecurrenceService()
+        self.progress_service = ProgressService()
+    
+    def get_user_tasks(
+        self,
+        user_id: int,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        is_completed: Optional[bool] = None,
+        category_id: Optional[int] = None,
+        priority: Optional[str] = None,
+        is_recurring: Optional[bool] = None
+    ) -> Tuple[List[TaskRow], Optional[str]]:
+        """Get a page of a user's tasks ordered by (start_time, id).
+        
+        Pages are keyset-paginated: ``cursor`` is the opaque ``next_cursor``
+        from the previous page, so each page is an index range scan on
+        (user_id, start_time, id) regardless of how many tasks come before it.
+        Returns read-only TaskRow records, with the category joined in, and
+        the cursor for the next page, or None at the end.
+        """
         db = SessionLocal()
         try:
-            tasks = db.query(Task).filter(Task.user_id == user_id).all()
-            return tasks
+            query = select(
+                *columns(Task, TaskRow, category=Category.name, category_color=Category.color)
+            ).outerjoin(Category, Category.id == Task.category_id).where(Task.user_id == user_id)
+            if is_completed is not None:
+                query = query.where(Task.is_completed == is_completed)
+            if category_id is not None:
+                query = query.where(Task.category_id == category_id)
+            if priority is not None:
+                query = query.where(Task.priority == priority)
+            if is_recurring is not None:
+                query = query.where(Task.is_recurring == is_recurring)
+            if cursor:
+                after_start_time, after_id = decode_task_cursor(cursor)
+                query = query.where(tuple_(Task.start_time, Task.id) > tuple_(after_start_time, after_id))
+            
+            tasks = fetch(db, TaskRow, query.order_by(Task.start_time, Task.id).limit(limit + 1))
+            next_cursor = None
+            if len(tasks) > limit:
+                tasks = tasks[:limit]
+                next_cursor = encode_task_cursor(tasks[-1])
+            return tasks, next_cursor
         finally:
             db.close()
     
@@ -27,35 +97,68 @@ class TaskService:
             db.close()
     
     def create_task(self, user_id: int, task_data: TaskCreate) -> Task:
-        """Create a new task."""
-        db = SessionLocal()
+        """Create a new task with a single INSERT ... RETURNING."""
+        db = SessionLocal(expire_on_commit=False)
         try:
-            task = Task(
-                user_id=user_id,
-                title=task_data.title,
-                description=task_data.description,
-                category_id=task_data.category_id,
-                start_time=task_data.start_time,
-                duration_minutes=task_data.duration_minutes,
-                is_recurring=task_data.is_recurring,
-                recurrence_pattern=task_data.recurrence_pattern,
-                priority=task_data.priority
-            )
-            db.add(task)
+            task = db.scalars(
+                insert(Task).values(
+                    user_id=user_id,
+                    title=task_data.title,
+                    description=task_data.description,
+                    category_id=task_data.category_id,
+                    start_time=task_data.start_time,
+                    duration_minutes=task_data.duration_minutes,
+                    is_recurring=task_data.is_recurring,
+                    recurrence_pattern=task_data.recurrence_pattern,
+                    priority=task_data.priority,
+                    is_completed=False
+                ).returning(Task)
+            ).one()
+            self._record_progress(db, None, task)
+            record_change(db, user_id, "task", "created", task.id)
             db.commit()
-            db.refresh(task)
+            after_commit(db, partial(self._index_task, task))
             return task
         finally:
             db.close()
     
+    def create_tasks_bulk(self, user_id: int, tasks_data: List[TaskCreate]) -> List[Task]:
+        """Create many tasks with one multi-row INSERT in a single transaction."""
+        db = SessionLocal(expire_on_commit=False)
+        try:
+            tasks = db.scalars(
+                insert(Task).returning(Task),
+                [dict(task_data.model_dump(), user_id=user_id) for task_data in tasks_data]
+            ).all()
+            deltas = {}
+            for task in tasks:
+                self.progress_service.add_change(deltas, None, self.progress_service.task_contribution(task))
+            self.progress_service.apply_deltas(db, deltas)
+            for task in tasks:
+                record_change(db, user_id, "task", "created", task.id)
+            db.commit()
+            for task in tasks:
+                after_commit(db, partial(self._index_task, task))
+            return tasks
+        finally:
+            db.close()
+    
     def update_task(self, task_id: int, user_id: int, task_data: TaskUpdate) -> Optional[Task]:
-        """Update a task."""
-        db = SessionLocal()
+        """Update a task.
+        
+        The row is read once because re-expanding schedules and the rollup
+        delta depend on its previous timing and state; the UPDATE is flushed
+        at commit and nothing is re-read afterwards.
+        """
+        db = SessionLocal(expire_on_commit=False)
         try:
             task = db.query(Task).filter(Task.id == task_id, Task.user_id == user_id).first()
             if not task:
                 return None
             
+            timing_before = self._timing(task)
+            progress_before = self.progress_service.task_contribution(task)
+            
             # Update fields
             if task_data.title is not None:
                 task.title = task_data.title
@@ -74,97 +177,281 @@ class TaskService:
             if task_data.priority is not None:
                 task.priority = task_data.priority
             
+            # Re-expand future schedule instances if timing or recurrence changed
+            if self._timing(task) != timing_before:
+                self.recurrence_service.reset(db, task)
+            self._record_progress(db, progress_before, task)
+            record_change(db, user_id, "task", "updated", task_id)
+            
             db.commit()
-            db.refresh(task)
+            after_commit(db, partial(self._index_task, task))
             return task
         finally:
             db.close()
     
     def delete_task(self, task_id: int, user_id: int) -> bool:
-        """Delete a task."""
+        """Delete a task with its schedules and streak, reading back only the deleted row."""
         db = SessionLocal()
         try:
-            task = db.query(Task).filter(Task.id == task_id, Task.user_id == user_id).first()
+            schedules = (Schedule.task_id == task_id, Schedule.user_id == user_id)
+            self.progress_service.subtract_schedules(db, *schedules)
+            record_schedule_tombstones(db, *schedules)
+            db.execute(delete(Schedule).where(*schedules).execution_options(synchronize_session=False))
+            db.execute(delete(Streak).where(Streak.task_id == task_id, Streak.user_id == user_id).execution_options(
+                synchronize_session=False
+            ))
+            task = db.scalars(
+                delete(Task).where(Task.id == task_id, Task.user_id == user_id).returning(Task).execution_options(
+                    synchronize_session=False
+                )
+            ).first()
             if not task:
                 return False
             
-            db.delete(task)
+            self._record_progress(db, self.progress_service.task_contribution(task), None)
+            record_tombstone(db, user_id, "task", task_id)
+            record_change(db, user_id, "task", "deleted", task_id)
             db.commit()
+            after_commit(db, partial(self.interval_index.remove, user_id, task_id))
             return True
         finally:
             db.close()
     
     def complete_task(self, task_id: int, user_id: int) -> bool:
         """Mark a task as completed."""
-        from datetime import datetime
-        db = SessionLocal()
-        try:
-            task = db.query(Task).filter(Task.id == task_id, Task.user_id == user_id).first()
-            if not task:
-                return False
-            
-            task.is_completed = True
-            task.completed_at = datetime.utcnow()
-            db.commit()
-            return True
-        finally:
-            db.close()
+        return self._set_completed(task_id, user_id, True)
     
     def uncomplete_task(self, task_id: int, user_id: int) -> bool:
         """Mark a task as not completed."""
-        db = SessionLocal()
+        return self._set_completed(task_id, user_id, False)
+    
+    def bulk_update_tasks(self, user_id: int, operations: List[TaskBulkOperation]) -> List[dict]:
+        """Apply complete/uncomplete/delete/reschedule operations to many tasks in one transaction.
+        
+        Each operation is a single UPDATE or DELETE ... RETURNING over the
+        user's requested ids, plus the set-based schedule, progress and
+        tombstone statements it implies. Returns one result per requested id
+        with status updated, deleted, unchanged or not_found.
+        """
+        requested = {task_id for operation in operations for task_id in operation.task_ids}
+        db = SessionLocal(expire_on_commit=False)
         try:
-            task = db.query(Task).filter(Task.id == task_id, Task.user_id == user_id).first()
-            if not task:
-                return False
+            owned = set(db.scalars(select(Task.id).where(Task.user_id == user_id, Task.id.in_(requested))))
+            deltas = {}
+            committed: Dict[int, Optional[Task]] = {}  # task id -> task to index, or None once deleted
+            results = []
+            for operation in operations:
+                ids = [task_id for task_id in operation.task_ids if task_id in owned]
+                changed = set()
+                if ids and operation.action == "delete":
+                    changed = self._bulk_delete(db, user_id, ids, deltas)
+                    owned -= changed
+                    committed.update(dict.fromkeys(changed))
+                elif ids:
+                    for task in self._bulk_update(db, user_id, operation, ids, deltas):
+                        changed.add(task.id)
+                        committed[task.id] = task
+                
+                status = "deleted" if operation.action == "delete" else "updated"
+                for task_id in operation.task_ids:
+                    if task_id in changed:
+                        results.append({"id": task_id, "action": operation.action, "status": status})
+                    elif task_id in owned:
+                        results.append({"id": task_id, "action": operation.action, "status": "unchanged"})
+                    else:
+                        results.append({"id": task_id, "action": operation.action, "status": "not_found"})
             
-            task.is_completed = False
-            task.completed_at = None
+            self.progress_service.apply_deltas(db, deltas)
             db.commit()
-            return True
+            for task_id, task in committed.items():
+                if task is None:
+                    after_commit(db, partial(self.interval_index.remove, user_id, task_id))
+                else:
+                    after_commit(db, partial(self._index_task, task))
+            return results
         finally:
             db.close()
     
+    def _bulk_update(self, db: Session, user_id: int, operation: TaskBulkOperation, ids: List[int], deltas) -> List[Task]:
+        """Run one complete/uncomplete/reschedule operation; returns the tasks it changed."""
+        incomplete = or_(Task.is_completed == False, Task.is_completed.is_(None))
+        criteria = [Task.user_id == user_id, Task.id.in_(ids)]
+        if operation.action == "complete":
+            criteria.append(incomplete)
+            values = {"is_completed": True, "completed_at": datetime.utcnow()}
+        elif operation.action == "uncomplete":
+            criteria.append(Task.is_completed == True)
+            values = {"is_completed": False, "completed_at": None}
+        else:
+            values = {}
+            if operation.start_time is not None:
+                values["start_time"] = operation.start_time
+            if operation.duration_minutes is not None:
+                values["duration_minutes"] = operation.duration_minutes
+            criteria.append(or_(*(getattr(Task, name) != value for name, value in values.items())))
+        
+        durations_before = {}
+        if "duration_minutes" in values:
+            # Completed one-off tasks count their duration in the rollups
+            durations_before = dict(db.execute(select(Task.id, Task.duration_minutes).where(*criteria, ~incomplete)).all())
+        
+        tasks = db.scalars(
+            update(Task).where(*criteria).values(**values).returning(Task).execution_options(
+                synchronize_session=False, populate_existing=True
+            )
+        ).all()
+        
+        action = {"complete": "completed", "uncomplete": "uncompleted"}.get(operation.action, "updated")
+        sign = {"complete": 1, "uncomplete": -1}.get(operation.action)
+        for task in tasks:
+            if sign is not None:
+                self._add_completion_change(deltas, task, sign)
+            elif task.id in durations_before:
+                contribution = self.progress_service.task_contribution(task)
+                if contribution is not None:
+                    task_user, day, _ = contribution
+                    minutes = (task.duration_minutes or 0) - (durations_before[task.id] or 0)
+                    self.progress_service.add_change(deltas, None, (task_user, day, [0, 0, minutes]))
+            record_change(db, user_id, "task", action, task.id)
+        
+        recurring = [task.id for task in tasks if task.is_recurring]
+        if operation.action == "reschedule" and recurring:
+            self.recurrence_service.reset_many(db, recurring)
+        return tasks
+    
+    def _bulk_delete(self, db: Session, user_id: int, ids: List[int], deltas) -> set:
+        """Delete the tasks with their schedules and streaks; returns the deleted ids."""
+        in_ids = Schedule.task_id.in_(ids)
+        self.progress_service.subtract_schedules(db, in_ids)
+        record_schedule_tombstones(db, in_ids)
+        db.execute(delete(Schedule).where(in_ids).execution_options(synchronize_session=False))
+        db.execute(delete(Streak).where(Streak.user_id == user_id, Streak.task_id.in_(ids)).execution_options(
+            synchronize_session=False
+        ))
+        tasks = db.scalars(
+            delete(Task).where(Task.user_id == user_id, Task.id.in_(ids)).returning(Task).execution_options(
+                synchronize_session=False
+            )
+        ).all()
+        for task in tasks:
+            self.progress_service.add_change(deltas, self.progress_service.task_contribution(task), None)
+            record_tombstone(db, user_id, "task", task.id)
+            record_change(db, user_id, "task", "deleted", task.id)
+        return {task.id for task in tasks}
+    
     def check_time_conflicts(self, user_id: int, start_time: str, duration_minutes: int, exclude_task_id: int = None) -> List[dict]:
         """Check for time conflicts with existing tasks."""
-        from datetime import datetime, timedelta
+        start = to_minutes(time.fromisoformat(start_time))
+        end = start + duration_minutes
+        
+        overlaps = self.interval_index.find_overlaps(
+            user_id, self._load_incomplete_intervals, start, end, exclude_task_id
+        )
+        return [self._conflict_dict(entry, start, end) for entry in overlaps]
+    
+    def check_time_conflicts_batch(self, user_id: int, proposals: List[ConflictProposal]) -> List[dict]:
+        """Check many proposed slots against existing tasks and against each other."""
+        slots = []
+        for proposal in proposals:
+            start = to_minutes(proposal.start_time)
+            slots.append((start, start + proposal.duration_minutes, proposal.exclude_task_id))
         
+        task_conflicts, proposal_conflicts = self.interval_index.find_batch_overlaps(
+            user_id, self._load_incomplete_intervals, slots
+        )
+        results = []
+        for index, (start, end, _) in enumerate(slots):
+            conflicts = [self._conflict_dict(entry, start, end) for entry in task_conflicts[index]]
+            results.append({
+                "index": index,
+                "has_conflicts": bool(conflicts or proposal_conflicts[index]),
+                "conflicts": conflicts,
+                "conflict_count": len(conflicts),
+                "proposal_conflicts": proposal_conflicts[index]
+            })
+        return results
+    
+    def _conflict_dict(self, entry: IntervalEntry, start: int, end: int) -> dict:
+        """Describe an indexed task overlapping the [start, end) slot."""
+        return {
+            "task_id": entry.task_id,
+            "title": entry.title,
+            "start_time": entry.start_time,
+            "duration_minutes": entry.duration_minutes,
+            "overlap_type": "full" if (start <= entry.start and end >= entry.end) else "partial"
+        }
+    
+    def _load_incomplete_intervals(self, user_id: int) -> List[IntervalEntry]:
+        """Load the interval fields of a user's incomplete tasks."""
         db = SessionLocal()
         try:
-            # Parse start time
-            start_datetime = datetime.strptime(start_time, "%H:%M")
-            
-            # Calculate end time
-            end_datetime = start_datetime + timedelta(minutes=duration_minutes)
-            
-            # Get all user's tasks for the same day
-            query = db.query(Task).filter(Task.user_id == user_id)
-            
-            # Exclude the current task if updating
-            if exclude_task_id:
-                query = query.filter(Task.id != exclude_task_id)
-            
-            existing_tasks = query.all()
-            conflicts = []
-            
-            for task in existing_tasks:
-                if task.is_completed:
-                    continue  # Skip completed tasks
-                
-                # Parse existing task times
-                task_start = datetime.strptime(task.start_time, "%H:%M")
-                task_end = task_start + timedelta(minutes=task.duration_minutes)
-                
-                # Check for overlap
-                if (start_datetime < task_end and end_datetime > task_start):
-                    conflicts.append({
-                        "task_id": task.id,
-                        "title": task.title,
-                        "start_time": task.start_time,
-                        "duration_minutes": task.duration_minutes,
-                        "overlap_type": "full" if (start_datetime <= task_start and end_datetime >= task_end) else "partial"
-                    })
+            rows = db.query(Task.id, Task.title, Task.start_time, Task.duration_minutes).filter(
+                Task.user_id == user_id,
+                or_(Task.is_completed == False, Task.is_completed.is_(None))
+            ).all()
+            return [IntervalEntry(row.id, row.title, row.start_time, row.duration_minutes) for row in rows]
+        finally:
+            db.close()
+    
+    def _set_completed(self, task_id: int, user_id: int, completed: bool) -> bool:
+        """Flip a task's completion with one conditional UPDATE ... RETURNING.
+        
+        The UPDATE only matches a task in the other state, so a returned row
+        is a real transition and its rollup delta is known without reading it
+        first. Only when nothing matched is the task looked up, to tell an
+        already-done task from a missing one.
+        """
+        db = SessionLocal(expire_on_commit=False)
+        try:
+            match = [Task.id == task_id, Task.user_id == user_id]
+            if completed:
+                state = or_(Task.is_completed == False, Task.is_completed.is_(None))
+                values = {"is_completed": True, "completed_at": datetime.utcnow()}
+            else:
+                state = Task.is_completed == True
+                values = {"is_completed": False, "completed_at": None}
+            task = db.scalars(
+                update(Task).where(*match, state).values(**values).returning(Task).execution_options(
+                    synchronize_session=False
+                )
+            ).first()
+            if task is None:
+                return db.query(Task.id).filter(*match).first() is not None
             
-            return conflicts
+            deltas = {}
+            self._add_completion_change(deltas, task, 1 if completed else -1)
+            self.progress_service.apply_deltas(db, deltas)
+            record_change(db, user_id, "task", "completed" if completed else "uncompleted", task_id)
+            db.commit()
+            after_commit(db, partial(self._index_task, task))
+            return True
         finally:
-            db.close() 
\ No newline at end of file
+            db.close()
+    
+    def _add_completion_change(self, deltas, task: Task, sign: int):
+        """Record a task entering (+1) or leaving (-1) the completed state in ``deltas``."""
+        contribution = self.progress_service.task_contribution(task)
+        if contribution is not None:
+            task_user, day, _ = contribution
+            self.progress_service.add_change(deltas, None, (task_user, day, [0, sign, sign * (task.duration_minutes or 0)]))
+    
+    def _record_progress(self, db: Session, before, task: Optional[Task]):
+        """Apply the change in a task's rollup contribution within the current transaction."""
+        deltas = {}
+        after = self.progress_service.task_contribution(task) if task is not None else None
+        self.progress_service.add_change(deltas, before, after)
+        self.progress_service.apply_deltas(db, deltas)
+    
+    def _timing(self, task: Task) -> tuple:
+        """Fields that determine when a task's schedule instances fall."""
+        return (task.start_time, task.duration_minutes, task.is_recurring, task.recurrence_pattern)
+    
+    def _index_task(self, task: Task):
+        """Reflect a committed task in the conflict index."""
+        if task.is_completed:
+            self.interval_index.remove(task.user_id, task.id)
+        else:
+            self.interval_index.upsert(
+                task.user_id,
+                IntervalEntry(task.id, task.title, task.start_time, task.duration_minutes)
+            )
@@ -0,0 +1,117 @@
+"""
+Template service for built-in schedule templates
+"""
+
+from database.connection import SessionLocal
+from models.category import Category
+from models.task import ConflictProposal, TaskCreate
+from services.task_service import TaskService
+from datetime import time
+from typing import Dict, List, Optional
+
+TEMPLATES = [
+    {
+        "id": "student",
+        "name": "Student Schedule",
+        "description": "Balanced schedule for students",
+        "tasks": [
+            {"title": "Morning Study", "time": "08:00", "duration": 60, "category": "Study"},
+            {"title": "Classes", "time": "10:00", "duration": 180, "category": "Study"},
+            {"title": "Lunch Break", "time": "13:00", "duration": 60, "category": "Personal"},
+            {"title": "Afternoon Study", "time": "14:00", "duration": 120, "category": "Study"},
+            {"title": "Exercise", "time": "16:30", "duration": 60, "category": "Exercise"},
+            {"title": "Evening Review", "time": "19:00", "duration": 90, "category": "Study"}
+        ]
+    },
+    {
+        "id": "professional",
+        "name": "Professional Schedule",
+        "description": "Productive work schedule",
+        "tasks": [
+            {"title": "Morning Routine", "time": "07:00", "duration": 60, "category": "Personal"},
+            {"title": "Work Start", "time": "09:00", "duration": 240, "category": "Work"},
+            {"title": "Lunch Break", "time": "13:00", "duration": 60, "category": "Personal"},
+            {"title": "Afternoon Work", "time": "14:00", "duration": 240, "category": "Work"},
+            {"title": "Exercise", "time": "18:00", "duration": 60, "category": "Exercise"},
+            {"title": "Evening Planning", "time": "20:00", "duration": 30, "category": "Work"}
+        ]
+    },
+    {
+        "id": "fitness",
+        "name": "Fitness Focus",
+        "description": "Health and fitness oriented schedule",
+        "tasks": [
+            {"title": "Morning Workout", "time": "06:00", "duration": 60, "category": "Exercise"},
+            {"title": "Breakfast", "time": "07:30", "duration": 30, "category": "Health"},
+            {"title": "Work", "time": "09:00", "duration": 240, "category": "Work"},
+            {"title": "Lunch", "time": "13:00", "duration": 60, "category": "Health"},
+            {"title": "Afternoon Work", "time": "14:00", "duration": 240, "category": "Work"},
+            {"title": "Evening Workout", "time": "18:00", "duration": 60, "category": "Exercise"},
+            {"title": "Dinner", "time": "19:30", "duration": 60, "category": "Health"}
+        ]
+    }
+]
+
+class TemplateService:
+    def __init__(self, task_service: Optional[TaskService] = None):
+        self.task_service = task_service or TaskService()
+        self._templates_by_id = {template["id"]: template for template in TEMPLATES}
+    
+    def get_templates(self) -> List[Dict]:
+        """Get available schedule templates."""
+        return TEMPLATES
+    
+    def get_template(self, template_id: str) -> Optional[Dict]:
+        """Get a template by id."""
+        return self._templates_by_id.get(template_id)
+    
+    def apply_template(self, user_id: int, template_id: str, force: bool = False) -> Optional[Dict]:
+        """Create all of a template's tasks for a user in one transaction.
+        
+        Returns None for an unknown template. If any template task conflicts
+        with the user's existing tasks and ``force`` is not set, nothing is
+        created and the conflicts are returned instead.
+        """
+        template = self.get_template(template_id)
+        if not template:
+            return None
+        
+        category_ids = self._resolve_categories({task["category"] for task in template["tasks"]})
+        
+        conflicts = self.task_service.check_time_conflicts_batch(user_id, [
+            ConflictProposal(start_time=task["time"], duration_minutes=task["duration"])
+            for task in template["tasks"]
+        ])
+        conflicting = [
+            {"title": task["title"], "conflicts": result["conflicts"]}
+            for task, result in zip(template["tasks"], conflicts) if result["conflicts"]
+        ]
+        if conflicting and not force:
+            return {"created": False, "tasks": [], "conflicts": conflicting}
+        
+        tasks = self.task_service.create_tasks_bulk(user_id, [
+            TaskCreate(
+                title=task["title"],
+                category_id=category_ids[task["category"]],
+                start_time=time.fromisoformat(task["time"]),
+                duration_minutes=task["duration"]
+            )
+            for task in template["tasks"]
+        ])
+        return {"created": True, "tasks": tasks, "conflicts": conflicting}
+    
+    def _resolve_categories(self, names: set) -> Dict[str, int]:
+        """Map category names to ids with a single query."""
+        db = SessionLocal()
+        try:
+            rows = db.query(Category.id, Category.name).filter(Category.name.in_(names)).all()
+        finally:
+            db.close()
+        
+        category_ids = {}
+        for row in rows:
+            category_ids.setdefault(row.name, row.id)
+        missing = names - category_ids.keys()
+        if missing:
+            raise ValueError(f"Missing categories: {', '.join(sorted(missing))}")
+        return category_ids
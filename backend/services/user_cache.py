@@ -0,0 +1,62 @@
+"""
+Per-user cache of derived data, invalidated by committed writes
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from services.events import data_version
+from typing import Any, Callable, Dict
+
+class UserCache:
+    """LRU cache of per-user values tagged with the user's data version.
+
+    An entry is only served while the user's data version (see
+    ``services.events``) is unchanged, so any committed write to the user's
+    tasks, schedules or streaks invalidates it. The version only counts
+    writes made in this process, so entries also expire after
+    ``ttl_seconds`` to pick up writes from other workers and maintenance.py.
+    A value computed while a write landed is returned to its caller but not
+    stored.
+    """
+
+    def __init__(self, max_users: int = 10000, ttl_seconds: float = 60.0):
+        self.max_users = max_users
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(self, user_id: int, key: str, compute: Callable[[], Any]) -> Any:
+        """Return the cached value for (user_id, key), computing it on a miss."""
+        version = data_version(user_id)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[0] == version and key in entry[1]:
+                value, stored_at = entry[1][key]
+                if now - stored_at < self.ttl_seconds:
+                    self._entries.move_to_end(user_id)
+                    self.hits += 1
+                    return value
+            self.misses += 1
+
+        value = compute()
+
+        with self._lock:
+            if data_version(user_id) == version and self.ttl_seconds > 0:
+                entry = self._entries.get(user_id)
+                if entry is None or entry[0] != version:
+                    entry = (version, {})
+                    self._entries[user_id] = entry
+                entry[1][key] = (value, now)
+                self._entries.move_to_end(user_id)
+                while len(self._entries) > self.max_users:
+                    self._entries.popitem(last=False)
+        return value
+
+    def stats(self) -> Dict:
+        """Return hit/miss counters for monitoring."""
+        with self._lock:
+            return {"users": len(self._entries), "ttl_seconds": self.ttl_seconds, "hits": self.hits, "misses": self.misses}
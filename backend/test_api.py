@@ -65,6 +65,14 @@ def test_templates():
     print(f"Response: {response.json()}")
     print()
 
+def test_metrics():
+    """Test runtime metrics endpoint."""
+    print("🔍 Testing metrics endpoint...")
+    response = requests.get(f"{BASE_URL}/api/metrics")
+    print(f"Status: {response.status_code}")
+    print(f"Response: {response.json()}")
+    print()
+
 def test_protected_endpoints(token):
     """Test protected endpoints with token."""
     if not token:
@@ -96,6 +104,138 @@ def test_protected_endpoints(token):
     print(f"Response: {response.json()}")
     print()
 
+# Most SQL statements each write may execute, as reported in X-DB-Statements.
+# Assumes the caller's principal is already cached (the first request warms it).
+STATEMENT_BUDGETS = {
+    "POST /api/tasks": 2,
+    "PUT /api/tasks/{id}": 2,
+    "PUT /api/tasks/{id} (new time)": 5,
+    "POST /api/tasks/{id}/complete": 2,
+    "POST /api/tasks/{id}/uncomplete": 2,
+    "POST /api/schedules": 2,
+    "PUT /api/schedules/{id}": 2,
+    "PUT /api/schedules/{id} (no change)": 3,
+    "POST /api/schedules/{id}/complete": 7,
+    "POST /api/schedules/{id}/uncomplete": 7,
+    "DELETE /api/schedules/{id}": 3,
+    "DELETE /api/schedules/{id} (completed)": 8,
+    "DELETE /api/tasks/{id}": 7,
+}
+
+def test_statement_budgets(token):
+    """Check that write endpoints stay within their SQL statement budgets."""
+    if not token:
+        print("❌ No token available, skipping statement budgets")
+        return
+    
+    headers = {"Authorization": f"Bearer {token}"}
+    today = datetime.now().date().isoformat()
+    
+    print("🔍 Testing statement budgets...")
+    requests.get(f"{BASE_URL}/api/tasks", headers=headers)
+    
+    def check(label, response):
+        used = int(response.headers["X-DB-Statements"])
+        checkouts = int(response.headers["X-DB-Checkouts"])
+        budget = STATEMENT_BUDGETS[label]
+        print(f"{label}: {response.status_code}, {used} statements (budget {budget}), {checkouts} connection checkouts")
+        assert response.status_code == 200, response.text
+        assert used <= budget, f"{label} ran {used} statements, budget is {budget}"
+        assert checkouts <= 1, f"{label} checked out {checkouts} connections"
+        return response.json()
+    
+    task = check("POST /api/tasks", requests.post(f"{BASE_URL}/api/tasks", headers=headers, json={
+        "title": "Budget check",
+        "category_id": 1,
+        "start_time": "09:00",
+        "duration_minutes": 30
+    }))["task"]
+    check("PUT /api/tasks/{id}", requests.put(f"{BASE_URL}/api/tasks/{task['id']}", headers=headers, json={"title": "Budget check (renamed)"}))
+    check("PUT /api/tasks/{id} (new time)", requests.put(f"{BASE_URL}/api/tasks/{task['id']}", headers=headers, json={"start_time": "10:00"}))
+    check("POST /api/tasks/{id}/complete", requests.post(f"{BASE_URL}/api/tasks/{task['id']}/complete", headers=headers))
+    check("POST /api/tasks/{id}/uncomplete", requests.post(f"{BASE_URL}/api/tasks/{task['id']}/uncomplete", headers=headers))
+    
+    schedule = check("POST /api/schedules", requests.post(f"{BASE_URL}/api/schedules", headers=headers, json={
+        "task_id": task["id"],
+        "scheduled_date": today,
+        "start_time": "10:00",
+        "end_time": "10:30"
+    }))["schedule"]
+    check("PUT /api/schedules/{id}", requests.put(f"{BASE_URL}/api/schedules/{schedule['id']}", headers=headers, json={"status": "completed"}))
+    # A body that changes nothing must not record a change; the dashboard ETag carries the data version
+    version = lambda: requests.get(f"{BASE_URL}/api/dashboard", headers=headers).headers["ETag"].split("-")[2]
+    before = version()
+    check("PUT /api/schedules/{id} (no change)", requests.put(f"{BASE_URL}/api/schedules/{schedule['id']}", headers=headers, json={"status": "completed"}))
+    assert version() == before, "a no-op schedule update recorded a change"
+    check("POST /api/schedules/{id}/complete", requests.post(f"{BASE_URL}/api/schedules/{schedule['id']}/complete", headers=headers))
+    check("POST /api/schedules/{id}/uncomplete", requests.post(f"{BASE_URL}/api/schedules/{schedule['id']}/uncomplete", headers=headers))
+    check("DELETE /api/schedules/{id}", requests.delete(f"{BASE_URL}/api/schedules/{schedule['id']}", headers=headers))
+    
+    # Deleting a completed schedule rolls back the streaks it fed, like uncompleting it
+    schedule = requests.post(f"{BASE_URL}/api/schedules", headers=headers, json={
+        "task_id": task["id"],
+        "scheduled_date": today,
+        "start_time": "10:00",
+        "end_time": "10:30"
+    }).json()["schedule"]
+    requests.post(f"{BASE_URL}/api/schedules/{schedule['id']}/complete", headers=headers)
+    check("DELETE /api/schedules/{id} (completed)", requests.delete(f"{BASE_URL}/api/schedules/{schedule['id']}", headers=headers))
+    streaks = requests.get(f"{BASE_URL}/api/streaks", headers=headers).json()["streaks"]
+    assert not any(streak["task_id"] == task["id"] for streak in streaks), "deleting a completed schedule left its task streak"
+    check("DELETE /api/tasks/{id}", requests.delete(f"{BASE_URL}/api/tasks/{task['id']}", headers=headers))
+    print()
+
+def test_list_query_counts(token):
+    """Check that list endpoints run the same number of statements however many rows they return (no N+1)."""
+    if not token:
+        print("❌ No token available, skipping list query counts")
+        return
+    
+    headers = {"Authorization": f"Bearer {token}"}
+    today = datetime.now().date().isoformat()
+    categories = requests.get(f"{BASE_URL}/api/categories").json()["categories"]
+    lists = {
+        "GET /api/tasks": f"{BASE_URL}/api/tasks",
+        "GET /api/schedules/{date}": f"{BASE_URL}/api/schedules/{today}",
+    }
+    
+    print("🔍 Testing list query counts...")
+    
+    def statement_counts():
+        counts = {}
+        for label, url in lists.items():
+            response = requests.get(url, headers=headers)
+            assert response.status_code == 200, response.text
+            counts[label] = int(response.headers["X-DB-Statements"])
+        return counts
+    
+    def add_rows(count):
+        for i in range(count):
+            task = requests.post(f"{BASE_URL}/api/tasks", headers=headers, json={
+                "title": f"Query count check {i}",
+                "category_id": categories[i % len(categories)]["id"],
+                "start_time": f"{i % 24:02d}:00",
+                "duration_minutes": 15
+            }).json()["task"]
+            requests.post(f"{BASE_URL}/api/schedules", headers=headers, json={
+                "task_id": task["id"],
+                "scheduled_date": today,
+                "start_time": task["start_time"],
+                "end_time": f"{i % 24:02d}:15"
+            })
+    
+    add_rows(1)
+    few = statement_counts()
+    add_rows(5)
+    many = statement_counts()
+    for label in lists:
+        print(f"{label}: {few[label]} statements with few rows, {many[label]} with more")
+        assert many[label] == few[label], f"{label} runs more statements as rows grow (N+1)"
+    
+    tasks = requests.get(lists["GET /api/tasks"], headers=headers).json()["tasks"]
+    assert all(task["category"] for task in tasks), "tasks are missing their category name"
+    print()
+
 def main():
     """Run all tests."""
     print("🚀 Starting API tests...")
@@ -108,6 +248,9 @@ def main():
         token = test_login()
         test_templates()
         test_protected_endpoints(token)
+        test_statement_budgets(token)
+        test_list_query_counts(token)
+        test_metrics()
         
         print("✅ All tests completed!")
         
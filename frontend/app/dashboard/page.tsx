@@ -1,6 +1,6 @@
 'use client'
 
-import { useState, useEffect } from 'react'
+import { useState, useEffect, useRef } from 'react'
 import Link from 'next/link'
 
 interface Task {
@@ -26,6 +26,7 @@ interface Streak {
 export default function DashboardPage() {
   const [tasks, setTasks] = useState<Task[]>([])
   const [streaks, setStreaks] = useState<Streak[]>([])
+  const dashboardEtag = useRef<string | null>(null)
   const [loading, setLoading] = useState(true)
   const [user, setUser] = useState<any>(null)
 
@@ -37,35 +38,63 @@ export default function DashboardPage() {
     }
 
     fetchDashboardData(token)
-    
-    // Refresh data every 30 seconds to keep it updated
-    const interval = setInterval(() => {
-      fetchDashboardData(token)
-    }, 30000)
 
-    return () => clearInterval(interval)
+    // Refetch when the server reports a change; the ETag keeps no-op refetches cheap.
+    // EventSource cannot send headers, so the token goes in the query string.
+    const streamUrl = `${process.env.NEXT_PUBLIC_BACKEND_URL || 'http://localhost:8000'}/api/changes/stream?token=${encodeURIComponent(token)}`
+    let stream: EventSource | undefined
+    let refetch: ReturnType<typeof setTimeout> | undefined
+    let reconnect: ReturnType<typeof setTimeout> | undefined
+    const scheduleRefetch = () => {
+      clearTimeout(refetch)
+      refetch = setTimeout(() => fetchDashboardData(token), 250)
+    }
+    const connect = () => {
+      stream = new EventSource(streamUrl)
+      stream.addEventListener('ready', scheduleRefetch)
+      stream.addEventListener('change', scheduleRefetch)
+      stream.addEventListener('resync', scheduleRefetch)
+      // Changes may be missed while disconnected, so refetch. The browser retries on its
+      // own unless it has given up on the stream; then reconnect after a pause.
+      stream.onerror = () => {
+        scheduleRefetch()
+        if (stream?.readyState === EventSource.CLOSED) {
+          clearTimeout(reconnect)
+          reconnect = setTimeout(connect, 5000)
+        }
+      }
+    }
+    connect()
+
+    // Slow fallback poll in case the stream is down or blocked along the way
+    const poll = setInterval(() => fetchDashboardData(token), 60000)
+
+    return () => {
+      clearTimeout(refetch)
+      clearTimeout(reconnect)
+      clearInterval(poll)
+      stream?.close()
+    }
   }, [])
 
   const fetchDashboardData = async (token: string) => {
     try {
-      const headers = {
+      const headers: Record<string, string> = {
         'Authorization': `Bearer ${token}`,
         'Content-Type': 'application/json',
       }
-
-              const [tasksResponse, streaksResponse] = await Promise.all([
-          fetch(`${process.env.NEXT_PUBLIC_BACKEND_URL || 'http://localhost:8000'}/api/tasks`, { headers }),
-          fetch(`${process.env.NEXT_PUBLIC_BACKEND_URL || 'http://localhost:8000'}/api/streaks`, { headers })
-        ])
-
-      if (tasksResponse.ok) {
-        const tasksData = await tasksResponse.json()
-        setTasks(tasksData.tasks || [])
+      if (dashboardEtag.current) {
+        headers['If-None-Match'] = dashboardEtag.current
       }
 
-      if (streaksResponse.ok) {
-        const streaksData = await streaksResponse.json()
-        setStreaks(streaksData.streaks || [])
+      const response = await fetch(`${process.env.NEXT_PUBLIC_BACKEND_URL || 'http://localhost:8000'}/api/dashboard`, { headers })
+
+      // 304: nothing changed since the last fetch, keep the current state
+      if (response.ok) {
+        const data = await response.json()
+        dashboardEtag.current = response.headers.get('ETag')
+        setTasks(data.tasks || [])
+        setStreaks(data.streaks || [])
       }
     } catch (error) {
       console.error('Error fetching dashboard data:', error)